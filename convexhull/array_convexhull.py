@@ -0,0 +1,301 @@
+import numpy as np
+from predicates import ORIENT_ERROR_BOUND, orient2d
+
+'''
+Array-native convex hull: takes an (N, 2) array of points and returns the indices
+of the hull vertices, counterclockwise from the lexicographically smallest point
+(the same canonical order as new_convexhull.computeHull(points, cyclic = True)).
+Sorting, cross products and filtering are whole-array operations, so no per-point
+Python tuples are built. batchHulls does the same for many small groups of points
+at once, returning all their hulls in CSR-style (offsets, indices) arrays, and
+approximateHull trades exactness for a single linear pass over huge inputs.
+'''
+
+# If an elimination pass removes less than 1/STALL_FRACTION of the chain, finish the chain with a scalar stack instead
+STALL_FRACTION = 16
+
+# Default number of vertical strips for approximateHull
+APPROXIMATE_STRIPS = 1024
+
+
+# Integer coordinates below this magnitude have exact int64 differences (coordinateColumns rejects larger ones)
+INT64_DIFFERENCE_LIMIT = 2 ** 62
+# Integer differences below this magnitude have exact int64 determinants (two products below 2^62 each)
+INT64_PRODUCT_LIMIT = 2 ** 31
+
+
+# Orientation determinants and signs of the triplets (a[k], b[k], c[k]) for arrays of indices into x and y (a scalar index is
+# broadcast): returns (det, signs), signs 1 counterclockwise, -1 clockwise, 0 collinear
+# Float triplets whose determinant is inside the rounding error bound are re-decided exactly by predicates.orient2d
+def orientationDeterminants(x, y, a, b, c):
+    if x.dtype == np.int64 and y.dtype == np.int64: return integerDeterminants(x, y, a, b, c)
+    left = (x[b] - x[a]) * (y[c] - y[a])
+    right = (y[b] - y[a]) * (x[c] - x[a])
+    det = left - right
+    signs = np.sign(det).astype(np.int8)
+    if det.dtype.kind == 'f':
+        # Both products exactly zero (a repeated index, say) is an exact zero: only a non-zero bound leaves doubt
+        bound = ORIENT_ERROR_BOUND * (np.abs(left) + np.abs(right))
+        uncertain = np.flatnonzero((np.abs(det) <= bound) & (bound > 0))
+        if len(uncertain): a, b, c = np.broadcast_arrays(a, b, c)
+        for k in uncertain.tolist():
+            i, j, l = a[k], b[k], c[k]
+            signs[k] = orient2d((float(x[i]), float(y[i])), (float(x[j]), float(y[j])), (float(x[l]), float(y[l])))
+    return det, signs
+
+
+# orientationDeterminants for int64 coordinates (see coordinateColumns), whose products wrap around silently once differences reach 2^31
+# Smaller differences are multiplied in int64 as they are. Larger ones, still exact in int64, are multiplied in float64 and filtered
+# by the error bound like float input, with the uncertain triplets decided by predicates.orient2d on Python ints
+# det is int64 when it is exact, float64 otherwise
+def integerDeterminants(x, y, a, b, c):
+    xa, ya = x[a], y[a]
+    ux, uy, vx, vy = x[b] - xa, y[b] - ya, x[c] - xa, y[c] - ya
+    if max(max(np.max(v, initial=0), -np.min(v, initial=0)) for v in (ux, uy, vx, vy)) < INT64_PRODUCT_LIMIT:
+        det = ux * vy - uy * vx
+        return det, np.sign(det).astype(np.int8)
+    left = ux.astype(np.float64) * vy.astype(np.float64)
+    right = uy.astype(np.float64) * vx.astype(np.float64)
+    det = left - right
+    signs = np.sign(det).astype(np.int8)
+    bound = ORIENT_ERROR_BOUND * (np.abs(left) + np.abs(right))
+    uncertain = np.flatnonzero((np.abs(det) <= bound) & (bound > 0))
+    if len(uncertain): a, b, c = np.broadcast_arrays(a, b, c)
+    for k in uncertain.tolist():
+        i, j, l = a[k], b[k], c[k]
+        signs[k] = orient2d((int(x[i]), int(y[i])), (int(x[j]), int(y[j])), (int(x[l]), int(y[l])))
+    return det, signs
+
+
+# Coordinate columns of an (N, 2) array for the orientation tests: integers as int64, which integerDeterminants keeps exact, and
+# anything else as float64. Integer coordinates must stay below 2^62 in magnitude, so that their int64 differences cannot wrap
+def coordinateColumns(points):
+    if not np.issubdtype(points.dtype, np.integer):
+        return points[:, 0].astype(np.float64), points[:, 1].astype(np.float64)
+    if points.size and (points.min() <= -INT64_DIFFERENCE_LIMIT or points.max() >= INT64_DIFFERENCE_LIMIT):
+        raise ValueError("integer coordinates must be below 2^62 in magnitude, got %d to %d" % (points.min(), points.max()))
+    return points[:, 0].astype(np.int64), points[:, 1].astype(np.int64)
+
+
+# Orientation signs only (see orientationDeterminants)
+def orientationSigns(x, y, a, b, c):
+    return orientationDeterminants(x, y, a, b, c)[1]
+
+
+# Sort points by (x, y) and drop repeated points, keeping the first index of each: O(n log(n))
+def sortedUnique(x, y):
+    # A plain argsort on x is several times faster than lexsort; only tied x values need the y tie-break
+    order = np.argsort(x, kind='stable')
+    if np.any(x[order[1:]] == x[order[:-1]]):
+        order = np.lexsort((y, x))
+    return dropRepeats(x, y, order)
+
+
+# Drop the entries of a sorted index array that repeat the point before them
+def dropRepeats(x, y, order):
+    if len(order) > 1:
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (np.diff(x[order]) != 0) | (np.diff(y[order]) != 0)
+        order = order[keep]
+    return order
+
+
+# Scalar monotone stack over a (mostly reduced) chain: keeps only turns whose cross product has the given sign
+# If group labels are given, the chain holds several groups back to back and the stack restarts at each group
+def stackChain(x, y, chain, sign, groups = None):
+    points = list(zip(x[chain].tolist(), y[chain].tolist()))
+    labels = groups[chain].tolist() if groups is not None else None
+    stack = []
+    base = 0
+    for k in range(len(chain)):
+        if labels is not None and k > 0 and labels[k] != labels[k - 1]:
+            base = len(stack)
+        while len(stack) - base >= 2 and orient2d(points[stack[-2]], points[stack[-1]], points[k]) * sign <= 0:
+            stack.pop()
+        stack.append(k)
+    return chain[stack]
+
+
+# Reduce an x-sorted index array to its lower (sign = 1) or upper (sign = -1) chain
+# Every pass drops, all at once, the points that fail to turn the right way against their current neighbours:
+# such a point lies on or beyond the segment between two input points straddling it, so it can never be a hull vertex
+# If group labels are given, each group's run of the chain is reduced on its own: triplets straddling two groups are never tested,
+# and a group that loses no point in a pass is finished, so it is set aside and later passes only scan the groups still changing
+def hullChain(x, y, chain, sign, groups = None):
+    finished = []
+    while len(chain) > 2:
+        drop = orientationSigns(x, y, chain[:-2], chain[1:-1], chain[2:]) * sign <= 0
+        keep = np.ones(len(chain), dtype=bool)
+        if groups is not None:
+            labels = groups[chain]
+            drop &= (labels[:-2] == labels[1:-1]) & (labels[2:] == labels[1:-1])
+            changing = np.zeros(int(labels.max()) + 1, dtype=bool)
+            changing[labels[1:-1][drop]] = True
+            active = changing[labels]
+            finished.append(chain[~active])
+            keep[1:-1] = ~drop
+            chain, keep = chain[active], keep[active]
+        else:
+            keep[1:-1] = ~drop
+        dropped = np.count_nonzero(drop)
+        if dropped == 0: break
+        if dropped * STALL_FRACTION < len(chain):
+            chain = stackChain(x, y, chain, sign, groups)
+            break
+        chain = chain[keep]
+    if finished:
+        chain = np.concatenate(finished + [chain])
+        chain = chain[np.argsort(groups[chain], kind='stable')]
+    return chain
+
+
+# Hull of the points order indexes, given sorted by (x, y) with no repeats: returns their indices counterclockwise from the first
+def sortedHull(x, y, order):
+    if len(order) <= 2: return order
+    lower = hullChain(x, y, order, 1)
+    upper = hullChain(x, y, order, -1)
+    # Lower chain runs left to right, upper chain is walked back right to left without repeating the two extremes
+    return np.concatenate((lower, upper[-2:0:-1]))
+
+
+# Akl-Toussaint heuristic: returns a boolean mask that is False for points strictly inside the octagon of extreme points
+# The extremes in the 8 compass directions are hull vertices in counterclockwise order, so anything strictly inside them is interior to the hull: O(n)
+def aklToussaint(x, y):
+    keep = np.ones(len(x), dtype=bool)
+    if len(x) < 4: return keep
+    total, difference = x + y, x - y
+    # Leftmost, bottom-left, bottom, bottom-right, rightmost, top-right, top, top-left
+    extremes = [np.argmin(x), np.argmin(total), np.argmin(y), np.argmax(difference),
+                np.argmax(x), np.argmax(total), np.argmax(y), np.argmin(difference)]
+    octagon = []
+    for i in extremes:
+        if not octagon or (x[i], y[i]) != (x[octagon[-1]], y[octagon[-1]]):
+            octagon.append(i)
+    while len(octagon) > 1 and (x[octagon[0]], y[octagon[0]]) == (x[octagon[-1]], y[octagon[-1]]):
+        octagon.pop()
+    if len(octagon) < 3: return keep
+
+    # A point is only discarded if it is strictly inside every edge by the exact test, so hull points are never lost
+    inside = np.ones(len(x), dtype=bool)
+    everything = np.arange(len(x))
+    for k in range(len(octagon)):
+        inside &= orientationSigns(x, y, octagon[k], octagon[(k + 1) % len(octagon)], everything) > 0
+    return ~inside
+
+
+# Prefilter a list of (x, y) points for the list-based engines: returns the surviving points and how many were discarded
+def prefilterPoints(points):
+    if len(points) < 4: return list(points), 0
+    array = np.asarray(points)
+    # Integers too large for int64 differences (or for int64 at all) are left to the exact list engines unfiltered
+    if array.dtype.kind not in 'iuf' or (array.dtype.kind != 'f' and (array.min() <= -INT64_DIFFERENCE_LIMIT or array.max() >= INT64_DIFFERENCE_LIMIT)):
+        return list(points), 0
+    keep = aklToussaint(*coordinateColumns(array))
+    survivors = [points[i] for i in np.flatnonzero(keep).tolist()]
+    return survivors, len(points) - len(survivors)
+
+
+# Compute the convex hull of an (N, 2) array, returning hull vertex indices counterclockwise from the lexicographically smallest point
+# With prefilter = True, interior points are discarded by aklToussaint before sorting; the count is stored in stats['prefilter_discarded'] if a dict is given
+def computeHull(points, prefilter = False, stats = None):
+    points = np.asarray(points)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("points must be an (N, 2) array, got shape %s" % (points.shape,))
+    x, y = coordinateColumns(points)
+
+    if prefilter:
+        survivors = np.flatnonzero(aklToussaint(x, y))
+        if stats is not None: stats['prefilter_discarded'] = len(x) - len(survivors)
+        return survivors[computeHull(points[survivors])]
+
+    return sortedHull(x, y, sortedUnique(x, y))
+
+
+# Convex hulls of many small groups in one call: points is an (N, 2) array and group_ids gives each point's non-negative integer group
+# Returns CSR-style (offsets, indices): the hull of group g is indices[offsets[g]:offsets[g + 1]], point indices counterclockwise from
+# the group's lexicographically smallest point, and groups with no points get an empty hull
+# All groups are sorted together and their chains reduced by the same whole-array passes, so there is no per-group Python call
+def batchHulls(points, group_ids):
+    points = np.asarray(points)
+    group_ids = np.asarray(group_ids)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("points must be an (N, 2) array, got shape %s" % (points.shape,))
+    if group_ids.shape != (len(points),) or (len(group_ids) and not np.issubdtype(group_ids.dtype, np.integer)):
+        raise ValueError("group_ids must be one integer label per point, got shape %s and dtype %s" % (group_ids.shape, group_ids.dtype))
+    if len(group_ids) and group_ids.min() < 0:
+        raise ValueError("group_ids must be non-negative")
+    group_ids = group_ids.astype(np.int64)
+    x, y = coordinateColumns(points)
+    group_count = int(group_ids.max()) + 1 if len(group_ids) else 0
+
+    # Sort by (group, x, y) and drop repeated points within a group, keeping the first index
+    order = np.lexsort((y, x, group_ids))
+    if len(order) > 1:
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (np.diff(group_ids[order]) != 0) | (np.diff(x[order]) != 0) | (np.diff(y[order]) != 0)
+        order = order[keep]
+
+    lower = hullChain(x, y, order, 1, group_ids)
+    upper = hullChain(x, y, order, -1, group_ids)
+    lower_counts = np.bincount(group_ids[lower], minlength=group_count)
+    upper_counts = np.bincount(group_ids[upper], minlength=group_count)
+    # A group's hull is its lower chain followed by its upper chain without the two extremes (which the lower chain already has)
+    sizes = lower_counts + np.maximum(upper_counts - 2, 0)
+    offsets = np.zeros(group_count + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    indices = np.empty(offsets[-1], dtype=np.int64)
+
+    # Rank of every chain entry within its group, then its slot in the output
+    lower_starts = np.cumsum(lower_counts) - lower_counts
+    lower_groups = group_ids[lower]
+    indices[offsets[lower_groups] + np.arange(len(lower)) - lower_starts[lower_groups]] = lower
+    upper_starts = np.cumsum(upper_counts) - upper_counts
+    upper_groups = group_ids[upper]
+    rank = np.arange(len(upper)) - upper_starts[upper_groups]
+    # The upper chain runs left to right, so its interior goes in reversed after the lower chain
+    interior = (rank > 0) & (rank < upper_counts[upper_groups] - 1)
+    slots = offsets[upper_groups] + lower_counts[upper_groups] + upper_counts[upper_groups] - 2 - rank
+    indices[slots[interior]] = upper[interior]
+    return offsets, indices
+
+
+# Approximate hull in O(n + k) for k = strips (Bentley, Faust and Preparata): returns (indices, error_bound), the indices in the same canonical
+# order as computeHull. The x-range is cut into k vertical strips and only the lowest and highest point of each strip (plus the extremes
+# on the leftmost and rightmost vertical lines) are hulled. The result lies inside the true hull, and every point lies within
+# error_bound = (max x - min x) / k of it: a point is level with the segment joining its strip's lowest and highest points, one strip width away at most
+def approximateHull(points, strips = APPROXIMATE_STRIPS):
+    points = np.asarray(points)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("points must be an (N, 2) array, got shape %s" % (points.shape,))
+    if strips < 1:
+        raise ValueError("strips must be at least 1, got %r" % (strips,))
+    x, y = coordinateColumns(points)
+    if len(x) == 0: return np.zeros(0, dtype=np.int64), 0.0
+
+    x_min, x_max = x.min(), x.max()
+    # Lowest and highest point on the leftmost and rightmost vertical lines
+    left = np.flatnonzero(x == x_min)
+    right = np.flatnonzero(x == x_max)
+    left_low, left_high = left[np.argmin(y[left])], left[np.argmax(y[left])]
+    right_low, right_high = right[np.argmin(y[right])], right[np.argmax(y[right])]
+    if x_min == x_max:
+        return (np.array([left_low]) if y[left_low] == y[left_high] else np.array([left_low, left_high])), 0.0
+
+    width = (float(x_max) - float(x_min)) / strips
+    strip = np.minimum(((x - x_min) / width).astype(np.int64), strips - 1)
+    # Strip extremes by scatter: each strip's lowest (highest) y, then one point attaining it, all in linear passes
+    extremes = []
+    for reduce, fill in ((np.minimum, np.inf), (np.maximum, -np.inf)):
+        bound = np.full(strips, fill)
+        reduce.at(bound, strip, y)
+        attained = np.flatnonzero(y == bound[strip])
+        chosen = np.full(strips, -1)
+        chosen[strip[attained]] = attained
+        extremes.append(chosen[chosen >= 0])
+    lows, highs = extremes
+
+    # Both chains run from the lexicographically smallest to the largest point, and strips are x-ordered, so no sort is needed
+    # A strip extreme on the leftmost or rightmost line repeats one of those points, and the chains need distinct points
+    lower = hullChain(x, y, dropRepeats(x, y, np.concatenate(([left_low], lows, [right_low, right_high]))), 1)
+    upper = hullChain(x, y, dropRepeats(x, y, np.concatenate(([left_low, left_high], highs, [right_high]))), -1)
+    return np.concatenate((lower, upper[-2:0:-1])), width
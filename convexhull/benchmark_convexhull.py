@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from queue import Empty
+
+import numpy as np
+
+import array_convexhull
+import best_convexhull_code_yet
+import convexhull
+import hull_engines
+import new_convexhull
+import quickhull
+
+'''
+Benchmark harness for the hull engines.
+Every (engine, distribution, size) case runs in its own child process with a time
+limit, so an engine that hangs or crashes on some input is recorded instead of
+stopping the run. Each case is timed `repeats` times (plus one untimed warm-up) and
+then run once more under tracemalloc for peak memory. Results are written as JSON
+and can be checked against a stored baseline:
+
+    python benchmark_convexhull.py --output bench.json
+    python benchmark_convexhull.py --baseline bench.json --tolerance 0.25
+'''
+
+# Engine name --> (function, input kind): 'list' engines get a list of (x, y) tuples, 'array' engines get an (N, 2) array
+ENGINES = {
+    'new_convexhull.computeHull': (lambda points: new_convexhull.computeHull(points), 'list'),
+    'new_convexhull.computeHull[cyclic]': (lambda points: new_convexhull.computeHull(points, cyclic = True), 'list'),
+    'new_convexhull.computeHullIndices': (new_convexhull.computeHullIndices, 'list'),
+    'new_convexhull.computeHullBottomUp': (new_convexhull.computeHullBottomUp, 'list'),
+    'best_convexhull_code_yet.computeHull': (best_convexhull_code_yet.computeHull, 'list'),
+    'convexhull.computeHull': (convexhull.computeHull, 'list'),
+    'convexhull.convex_hull': (lambda points: convexhull.convex_hull(list(points)), 'list'),
+    'array_convexhull.computeHull': (array_convexhull.computeHull, 'array'),
+    'array_convexhull.approximateHull': (array_convexhull.approximateHull, 'array'),
+    'hull_engines.hull[chan]': (lambda points: hull_engines.hull(points, algorithm = 'chan'), 'list'),
+    'hull_engines.hull[monotone_chain]': (lambda points: hull_engines.hull(points, algorithm = 'monotone_chain'), 'list'),
+    'hull_engines.hull[quickhull]': (lambda points: hull_engines.hull(points, algorithm = 'quickhull'), 'list'),
+    'quickhull.computeHull': (quickhull.computeHull, 'array'),
+}
+
+DISTRIBUTIONS = ['uniform', 'circle', 'gaussian', 'clustered', 'collinear']
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+
+# Generate n points from a named distribution, reproducibly for a given seed
+def generatePoints(distribution, n, seed = 0):
+    rng = np.random.default_rng(seed)
+    if distribution == 'uniform':
+        return rng.random((n, 2))
+    if distribution == 'circle':
+        angles = rng.random(n) * 2 * np.pi
+        return np.column_stack((np.cos(angles), np.sin(angles)))
+    if distribution == 'gaussian':
+        return rng.standard_normal((n, 2))
+    if distribution == 'clustered':
+        centers = rng.random((10, 2)) * 100
+        return centers[rng.integers(0, len(centers), n)] + rng.standard_normal((n, 2))
+    if distribution == 'collinear':
+        x = rng.integers(0, n, n)
+        return np.column_stack((x, 2 * x + 1))
+    raise ValueError("unknown distribution %r, expected one of %s" % (distribution, DISTRIBUTIONS))
+
+
+# Child process body: time one case and send the measurements back through the queue
+def runCase(engine, distribution, n, repeats, queue):
+    function, kind = ENGINES[engine]
+    points = generatePoints(distribution, n)
+    if kind == 'list': points = [tuple(p) for p in points.tolist()]
+    times = []
+    # Engines that print their progress would otherwise be timed writing to the terminal
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        function(points)
+        for i in range(repeats):
+            start = time.perf_counter()
+            function(points)
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        function(points)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    queue.put({'times': times, 'peak_memory_bytes': peak})
+
+
+# Run one case in a child process, giving up after timeout seconds
+def measure(engine, distribution, n, repeats, timeout):
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    process = context.Process(target = runCase, args = (engine, distribution, n, repeats, queue))
+    process.start()
+    deadline = time.time() + timeout
+    measurement, status = None, 'timeout'
+    # Poll so that a child which crashes is noticed straight away rather than at the deadline
+    while time.time() < deadline:
+        try:
+            measurement = queue.get(timeout = 0.1)
+            break
+        except Empty:
+            if not process.is_alive():
+                try: measurement = queue.get(timeout = 0.1)
+                except Empty: status = 'error'
+                break
+    if process.is_alive():
+        process.terminate()
+    process.join()
+    result = {'engine': engine, 'distribution': distribution, 'size': n}
+    if measurement is None:
+        result['status'] = status
+        return result
+    times = np.array(measurement['times'])
+    result.update(status = 'ok', times = measurement['times'], peak_memory_bytes = measurement['peak_memory_bytes'],
+                  min = float(times.min()), median = float(np.median(times)),
+                  p90 = float(np.percentile(times, 90)), p99 = float(np.percentile(times, 99)))
+    return result
+
+
+# Run every requested case; once an engine fails on a distribution, its larger sizes for that distribution are skipped
+def runBenchmarks(engines = None, distributions = None, sizes = None, repeats = 5, timeout = 60.0, log = None):
+    results = []
+    for engine in engines or list(ENGINES):
+        for distribution in distributions or DISTRIBUTIONS:
+            failed = False
+            for n in sorted(sizes or SIZES):
+                if failed:
+                    result = {'engine': engine, 'distribution': distribution, 'size': n, 'status': 'skipped'}
+                else:
+                    result = measure(engine, distribution, n, repeats, timeout)
+                    failed = result['status'] != 'ok'
+                if log is not None:
+                    log.write("%-40s %-10s %9d  %s\n" % (engine, distribution, n,
+                              "%.6fs median" % result['median'] if result['status'] == 'ok' else result['status']))
+                results.append(result)
+    return {'meta': {'python': platform.python_version(), 'machine': platform.machine(), 'repeats': repeats,
+                     'timeout': timeout, 'created': time.strftime('%Y-%m-%dT%H:%M:%S')},
+            'results': results}
+
+
+# List the cases that got slower than the baseline median by more than tolerance (0.25 = 25%), or stopped finishing
+def compareToBaseline(report, baseline, tolerance = 0.25):
+    previous = {(r['engine'], r['distribution'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        before = previous.get((result['engine'], result['distribution'], result['size']))
+        if before is None or before['status'] != 'ok': continue
+        if result['status'] not in ('ok', 'skipped'):
+            regressions.append("%s %s n=%d: %s (baseline %.6fs)" % (result['engine'], result['distribution'], result['size'], result['status'], before['median']))
+        elif result['status'] == 'ok' and result['median'] > before['median'] * (1 + tolerance):
+            regressions.append("%s %s n=%d: median %.6fs vs baseline %.6fs" % (result['engine'], result['distribution'], result['size'], result['median'], before['median']))
+    return regressions
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Benchmark the convex hull engines and report JSON timings.")
+    parser.add_argument('--engines', nargs = '+', choices = list(ENGINES), default = list(ENGINES))
+    parser.add_argument('--distributions', nargs = '+', choices = DISTRIBUTIONS, default = DISTRIBUTIONS)
+    parser.add_argument('--sizes', nargs = '+', type = int, default = SIZES)
+    parser.add_argument('--repeats', type = int, default = 5)
+    parser.add_argument('--timeout', type = float, default = 60.0, help = "seconds allowed per case")
+    parser.add_argument('--output', help = "write the JSON report here (default: stdout)")
+    parser.add_argument('--baseline', help = "JSON report to compare against; exit with status 1 on a regression")
+    parser.add_argument('--tolerance', type = float, default = 0.25, help = "allowed slowdown of the median, as a fraction")
+    args = parser.parse_args(argv)
+
+    report = runBenchmarks(args.engines, args.distributions, args.sizes, args.repeats, args.timeout, log = sys.stderr)
+    if args.output:
+        with open(args.output, 'w') as output: json.dump(report, output, indent = 2)
+    else:
+        json.dump(report, sys.stdout, indent = 2)
+        sys.stdout.write('\n')
+
+    if args.baseline:
+        with open(args.baseline) as baseline: regressions = compareToBaseline(report, json.load(baseline), args.tolerance)
+        for regression in regressions: sys.stderr.write("REGRESSION: %s\n" % regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
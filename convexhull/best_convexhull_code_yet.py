@@ -1,5 +1,7 @@
 import math
 import sys
+import time
+from predicates import orient2d
 
 EPSILON = sys.float_info.epsilon
 
@@ -39,27 +41,27 @@ def triangleArea(a, b, c):
 Given three points a,b,c,
 returns True if and only if 
 a,b,c represents a clockwise sequence
-(subject to floating-point precision)
+(exactly, see predicates.orient2d)
 '''
 def cw(a, b, c):
-	return triangleArea(a,b,c) < EPSILON;
+	return orient2d(a, b, c) < 0
 '''
 Given three points a,b,c,
 returns True if and only if 
 a,b,c represents a counter-clockwise sequence
-(subject to floating-point precision)
+(exactly, see predicates.orient2d)
 '''
 def ccw(a, b, c):
-	return triangleArea(a,b,c) > EPSILON;
+	return orient2d(a, b, c) > 0
 
 '''
 Given three points a,b,c,
 returns True if and only if 
 a,b,c are collinear
-(subject to floating-point precision)
+(exactly, see predicates.orient2d)
 '''
 def collinear(a, b, c):
-	return abs(triangleArea(a,b,c)) <= EPSILON
+	return orient2d(a, b, c) == 0
 
 '''
 Given a list of points,
@@ -79,18 +81,13 @@ Replace the implementation of computeHull with a correct computation of the conv
 using the divide-and-conquer algorithm
 '''
 # Convenient helper function that will tell us how point c is oriented towards tangent line formed by (a, b)
-# collinear, cw and ccw helper functions above produce runtime errors for certain random inputs
+# 1 if the triplet turns clockwise, -1 if counterclockwise, 0 if collinear: the exact sign of predicates.orient2d, negated
 def findOrientation(a, b, c):
-    # Compute slopes of line segments from points a to b and b to c respectively
-    slope_a_to_b = (b[1]-a[1]) * (c[0]-b[0]) 
-    slope_b_to_c = (c[1]-b[1]) * (b[0]-a[0])
-    # If slope from a to b is equal to slope from b to c, it's collinear: greater --> triplet has clockwise orientation, lesser --> counterclockwise orientation
-    if slope_a_to_b == slope_b_to_c:  return 0  
-    elif slope_a_to_b > slope_b_to_c: return 1
-    else: return -1
+    return -orient2d(a, b, c)
 
 
-def findTangents(left_hull, right_hull):
+# With a HullTrace (see hull_trace.py), the number of steps each tangent walk takes (pointer advances) is recorded at the given recursion depth
+def findTangents(left_hull, right_hull, trace = None, depth = 0):
     # Find the indexes of the rightmost point of the left hull and the leftmost point of the right hull: O(n)
     left_index, right_index = 0, 0
     for i in range(len(left_hull)):
@@ -101,17 +98,21 @@ def findTangents(left_hull, right_hull):
             right_index = i
 
     # We will iterate through each point in left_hull and right_hull to find the upper tangent: O(n)
+    steps = 0
     while True:
         # If our current tangent line (left_hull[left_index], right_hull[right_index]) is NOT counterclockwise to our clockwise point on right_hull, we move right_index clockwise
         if findOrientation(left_hull[left_index], right_hull[right_index], right_hull[(right_index + 1) % len(right_hull)]) < 0: # >
             right_index = (right_index + 1) % len(right_hull)
+            steps += 1
         # If our current tangent line is NOT clockwise to our counterclockwise point of left_hull, we move left_index counterclockwise
         elif findOrientation(right_hull[right_index], left_hull[left_index], left_hull[(left_index + len(left_hull) - 1) % len(left_hull)]) > 0: # <=
             left_index = (left_index + len(left_hull)- 1) % len(left_hull)
+            steps += 1
         # If our point at left_index is counterclockwise to left_hull and right_index is clockwise to right_hull, we've found out point
         else:
             break 
     upper = (left_index, right_index)
+    if trace is not None: trace.walk(depth, 'upper', steps)
 
     # Find the indexes of the leftmost point of the left hull and the rightmost point of the right hull: O(n)
     left_index, right_index = 0, 0
@@ -123,22 +124,27 @@ def findTangents(left_hull, right_hull):
             right_index = i
 
     # Iterate through left_hull and right_hull to find lower tangent: O(n)
+    steps = 0
     while True:
         # If our current tangent line (left_hull[left_index], right_hull[right_index]) is counterclockwise to our clockwise point on right_hull, we move right_index clockwise
         if findOrientation(left_hull[left_index], right_hull[right_index], right_hull[(right_index + len(right_hull) - 1) % len(right_hull)]) > 0: #<
             right_index = (right_index + len(right_hull) - 1) % len(right_hull)
+            steps += 1
         # If our current tangent line is NOT clockwise to our counterclockwise point of left_hull, we move left_index counterclockwise
         elif findOrientation(right_hull[right_index], left_hull[left_index], left_hull[(left_index + 1) % len(left_hull)]) < 0: # >=
             left_index = (left_index + 1) % len(left_hull)
+            steps += 1
         # If our point at left_index is clockwise to left_hull and right_index is counterclockwise to right_hull, we've found out point 
         else:
             break
     lower = (left_index, right_index)
+    if trace is not None: trace.walk(depth, 'lower', steps)
 
     return upper, lower
 
 
-def mergeHulls(left_hull, right_hull):
+def mergeHulls(left_hull, right_hull, trace = None, depth = 0):
+    if trace is not None: start = time.perf_counter()
     # Sort points in left_hull and right_hull in counterclockwise order: O(n log (n)) -- Approximately = O(n)
     clockwiseSort(left_hull)
     clockwiseSort(right_hull)
@@ -146,7 +152,7 @@ def mergeHulls(left_hull, right_hull):
     #right_hull.reverse()
 
     # Find the upper tangent and lower tangent of the hulls
-    upper, lower = findTangents(left_hull, right_hull)
+    upper, lower = findTangents(left_hull, right_hull, trace, depth)
 
     # Merge the hulls using the upper and lower tangents
     merged_hull = []
@@ -164,11 +170,13 @@ def mergeHulls(left_hull, right_hull):
         merged_hull.append(right_hull[i])
         i = (i+ 1) % len(right_hull)
     merged_hull.append(right_hull[upper[1]])
-    print(merged_hull)
+    if trace is not None: trace.merge(depth, len(left_hull), len(right_hull), len(merged_hull), time.perf_counter() - start)
 
     return merged_hull
 
-def computeHull(points, initial = True):
+# Pass a HullTrace as trace to record every call, tangent walk and merge (depth counts the recursion levels above this call)
+def computeHull(points, initial = True, trace = None, depth = 0):
+    if trace is not None: trace.call(depth, len(points))
     # If we have three points or less, we have a triangle, line or single point which is its own convex hull
     if len(points) <= 3: return points  
 
@@ -179,10 +187,10 @@ def computeHull(points, initial = True):
 
     # Recursively find the convex hulls of the left and right point sets
     mid = len(points) // 2
-    left_hull = computeHull(points[:mid], initial)
-    right_hull = computeHull(points[mid:], initial)
+    left_hull = computeHull(points[:mid], initial, trace, depth + 1)
+    right_hull = computeHull(points[mid:], initial, trace, depth + 1)
 
     # Merge the convex hulls of the left and right point sets
-    convex_hull = mergeHulls(left_hull, right_hull)
+    convex_hull = mergeHulls(left_hull, right_hull, trace, depth)
 
     return convex_hull
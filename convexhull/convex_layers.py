@@ -0,0 +1,57 @@
+from dynamic_convexhull import combine
+from hull_engines import allInts, monotoneChain
+
+'''
+Convex layers (onion peeling): the outermost layer is the hull's vertices, the
+next layer the vertices of the hull of what is left, and so on, which is what
+calling computeHull repeatedly and removing each hull's vertices gives. Points on
+a hull edge are not vertices, so they belong to a deeper layer.
+
+Rather than recomputing a hull from scratch for every layer, the points are kept in
+a deletion-only version of dynamic_convexhull's tree: x-sorted blocks of points at
+the leaves, and at every node the merge of its children's hulls. Points are only
+ever removed, so the blocks never move. Peeling a layer removes its vertices from
+their blocks and recomputes only those blocks and the nodes above them, once per
+layer. The root then holds the next layer.
+'''
+
+# Distinct points per leaf block: each peeled block is re-hulled from scratch, so blocks are kept small
+LAYER_BLOCK = 16
+
+
+# Convex layer of every point in a list of (x, y) points: returns a list of layer numbers, 0 for the outermost hull's vertices
+# Repeated points share their layer
+def convexLayers(points, block_size = LAYER_BLOCK):
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1, got %r" % (block_size,))
+    ordered = sorted(set(map(tuple, points)))
+    exact_ints = allInts(ordered)
+    blocks = [ordered[i:i + block_size] for i in range(0, len(ordered), block_size)]
+    size = 1
+    while size < len(blocks): size *= 2
+    tree = [[] for i in range(2 * size)]
+    for i in range(len(blocks)):
+        tree[size + i] = monotoneChain(blocks[i], exact_ints)
+    for node in range(size - 1, 0, -1):
+        tree[node] = combine(tree[2 * node], tree[2 * node + 1])
+
+    # Block of every distinct point, found once: the blocks are consecutive runs of the sorted points
+    block_of = {point: i // block_size for i, point in enumerate(ordered)}
+    layer_of = {}
+    layer = 0
+    while tree[1]:
+        dirty = set()
+        for point in tree[1]:
+            layer_of[point] = layer
+            dirty.add(block_of[point])
+        for i in dirty:
+            blocks[i] = [point for point in blocks[i] if point not in layer_of]
+            tree[size + i] = monotoneChain(blocks[i], exact_ints)
+        # Redo the merges above the peeled blocks, one level at a time so every node is merged once
+        nodes = {(size + i) // 2 for i in dirty} - {0}
+        while nodes:
+            for node in nodes:
+                tree[node] = combine(tree[2 * node], tree[2 * node + 1])
+            nodes = {node // 2 for node in nodes if node > 1}
+        layer += 1
+    return [layer_of[tuple(point)] for point in points]
@@ -0,0 +1,175 @@
+import heapq
+
+from hull_engines import allInts, monotoneChain
+from hull_tangents import merge, rightmostIndex
+from predicates import crossSign, orient2d
+
+'''
+Set operations on convex hulls in canonical order (counterclockwise from the
+lexicographically smallest vertex, as computeHull(points, cyclic = True) and the
+other engines return them), in time linear in the hull sizes instead of
+re-hulling the concatenated points.
+
+intersectHulls follows O'Rourke, Chien, Olson and Naddor: one edge of each polygon
+is current, and whichever edge points towards the other one's line is advanced,
+so both boundaries are chased around together in O(h1 + h2) steps, emitting the
+crossings and the vertices lying inside the other polygon. unionHull merges
+the two vertex sequences in lexicographic order and runs a single monotone chain.
+When the hulls are x-separated it uses the binary-search bridges of
+hull_tangents.merge instead.
+'''
+
+# Which polygon's boundary is currently inside the other one during the edge chase
+UNKNOWN, FIRST_INSIDE, SECOND_INSIDE = 0, 1, 2
+
+
+# Intersection of the closed segments a -> b and c -> d: returns (code, p, q) with code '0' if they do not meet, '1' if they cross at the
+# single interior point p, 'v' if an endpoint (p) of one lies on the other, or 'e' if they are collinear and overlap from p to q
+def segmentIntersection(a, b, c, d):
+    o1, o2 = orient2d(a, b, c), orient2d(a, b, d)
+    if o1 == 0 and o2 == 0:
+        low, high = max(min(a, b), min(c, d)), min(max(a, b), max(c, d))
+        return ('e', low, high) if low <= high else ('0', None, None)
+    o3, o4 = orient2d(c, d, a), orient2d(c, d, b)
+    if o1 * o2 > 0 or o3 * o4 > 0: return '0', None, None
+    if o1 == 0: return 'v', c, None
+    if o2 == 0: return 'v', d, None
+    if o3 == 0: return 'v', a, None
+    if o4 == 0: return 'v', b, None
+    t = ((c[0] - a[0]) * (d[1] - c[1]) - (c[1] - a[1]) * (d[0] - c[0])) / ((b[0] - a[0]) * (d[1] - c[1]) - (b[1] - a[1]) * (d[0] - c[0]))
+    return '1', (a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1])), None
+
+
+# Canonical form of a convex polygon given as a counterclockwise cycle of points that may repeat points or have collinear runs: O(k)
+# Degenerate polygons come out as the one point or the two segment ends
+def canonicalPolygon(polygon):
+    if not polygon: return []
+    start = polygon.index(min(polygon))
+    cycle = polygon[start:] + polygon[:start]
+    stack = []
+    for point in cycle + [cycle[0]]:
+        while len(stack) >= 2 and orient2d(stack[-2], stack[-1], point) <= 0:
+            stack.pop()
+        if not stack or stack[-1] != point: stack.append(point)
+    stack = stack[:-1] if len(stack) > 1 else stack
+    if len(stack) < 3:
+        low, high = min(polygon), max(polygon)
+        return [low] if low == high else [low, high]
+    return stack
+
+
+# Returns True if point is inside or on a canonical hull of at least three vertices: O(h)
+def insideOrOn(hull, point):
+    return all(orient2d(hull[i - 1], hull[i], point) >= 0 for i in range(len(hull)))
+
+
+# Intersection of a point or segment (one or two points) with a hull of at least three vertices, by clipping against each edge: O(h)
+def clipSmall(small, hull):
+    if len(small) == 1: return list(small) if insideOrOn(hull, small[0]) else []
+    a, b = small
+    low, high = 0.0, 1.0
+    for i in range(len(hull)):
+        p, q = hull[i - 1], hull[i]
+        # Signed offsets of a and b from the edge line: inside is positive
+        at_a = (q[0] - p[0]) * (a[1] - p[1]) - (q[1] - p[1]) * (a[0] - p[0])
+        at_b = (q[0] - p[0]) * (b[1] - p[1]) - (q[1] - p[1]) * (b[0] - p[0])
+        side_a, side_b = orient2d(p, q, a), orient2d(p, q, b)
+        if side_a < 0 and side_b < 0: return []
+        if side_a < 0: low = max(low, at_a / (at_a - at_b))
+        elif side_b < 0: high = min(high, at_a / (at_a - at_b))
+    if low > high: return []
+    point = lambda t: a if t == 0 else b if t == 1 else (a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1]))
+    return canonicalPolygon([point(low), point(high)])
+
+
+# Intersection of two canonical hulls, as a canonical hull (a point or segment if they only touch, [] if disjoint): O(h1 + h2)
+# Vertices where the boundaries cross are computed in floating point; every other vertex is an input vertex
+def intersectHulls(first, second):
+    first, second = [tuple(vertex) for vertex in first], [tuple(vertex) for vertex in second]
+    n, m = len(first), len(second)
+    if n == 0 or m == 0: return []
+    if n < 3 and m < 3:
+        if n == 1 or m == 1:
+            point, other = (first[0], second) if n == 1 else (second[0], first)
+            return [point] if (point in other or (len(other) == 2 and segmentIntersection(other[0], other[1], point, point)[0] != '0')) else []
+        code, p, q = segmentIntersection(first[0], first[1], second[0], second[1])
+        return [] if code == '0' else canonicalPolygon([p, q] if code == 'e' else [p])
+    if n < 3: return clipSmall(first, second)
+    if m < 3: return clipSmall(second, first)
+
+    a = b = 0
+    # Steps taken along each polygon: both boundaries are chased around at most twice
+    a_steps = b_steps = 0
+    inside = UNKNOWN
+    crossed = False
+    polygon = []
+    while True:
+        a_from, b_from = first[a - 1], second[b - 1]
+        a_to, b_to = first[a], second[b]
+        turn = crossSign(a_from, a_to, b_from, b_to)
+        a_side = orient2d(b_from, b_to, a_to)
+        b_side = orient2d(a_from, a_to, b_to)
+        code, p, q = segmentIntersection(a_from, a_to, b_from, b_to)
+        if code == '1' or code == 'v':
+            # Count the steps from the first crossing, so the chase goes once around both polygons after it
+            if inside == UNKNOWN and not crossed:
+                a_steps = b_steps = 0
+                crossed = True
+            polygon.append(p)
+            if a_side > 0: inside = FIRST_INSIDE
+            elif b_side > 0: inside = SECOND_INSIDE
+        # Edges overlapping in opposite directions: the polygons lie on either side of the line and only share that segment
+        if code == 'e' and (a_to[0] - a_from[0]) * (b_to[0] - b_from[0]) + (a_to[1] - a_from[1]) * (b_to[1] - b_from[1]) < 0:
+            return canonicalPolygon([p, q])
+        # Parallel edges with each outside the other's line: the polygons are disjoint
+        if turn == 0 and a_side < 0 and b_side < 0: return []
+
+        # Advance the edge that aims at the other's line, emitting its end vertex if that boundary is the inside one
+        if turn == 0 and a_side == 0 and b_side == 0:
+            advance_first = inside != FIRST_INSIDE
+        elif turn >= 0:
+            advance_first = b_side > 0
+        else:
+            advance_first = a_side <= 0
+        if advance_first:
+            if inside == FIRST_INSIDE: polygon.append(a_to)
+            a, a_steps = (a + 1) % n, a_steps + 1
+        else:
+            if inside == SECOND_INSIDE: polygon.append(b_to)
+            b, b_steps = (b + 1) % m, b_steps + 1
+        if not ((a_steps < n or b_steps < m) and a_steps < 2 * n and b_steps < 2 * m): break
+
+    if crossed: return canonicalPolygon(polygon)
+    # The boundaries never met: one polygon is inside the other, or they are disjoint
+    if insideOrOn(second, first[0]): return list(first)
+    if insideOrOn(first, second[0]): return list(second)
+    return []
+
+
+# Vertices of a canonical hull in lexicographic order, merging its lower chain with its reversed upper chain: O(h)
+def sortedVertices(hull):
+    if len(hull) <= 2: return list(hull)
+    r = rightmostIndex(hull)
+    return list(heapq.merge(hull[:r + 1], hull[:r:-1]))
+
+
+# Hull of the union of two canonical hulls, in canonical order: O(h1 + h2), or O(log^2(h)) bridge searches if they are x-separated
+def unionHull(first, second):
+    first, second = [tuple(vertex) for vertex in first], [tuple(vertex) for vertex in second]
+    if not first: return second
+    if not second: return first
+    if first[rightmostIndex(first)] < second[0] or second[rightmostIndex(second)] < first[0]: return merge(first, second)
+    ordered = []
+    for point in heapq.merge(sortedVertices(first), sortedVertices(second)):
+        if not ordered or ordered[-1] != point: ordered.append(point)
+    return monotoneChain(ordered, allInts(ordered))
+
+
+# Hull of the union of many canonical hulls, merged pairwise level by level: O(H log(k)) for k hulls with H vertices in all
+def unionHulls(hulls):
+    hulls = list(hulls)
+    while len(hulls) > 1:
+        merged = [unionHull(hulls[i], hulls[i + 1]) for i in range(0, len(hulls) - 1, 2)]
+        if len(hulls) % 2 == 1: merged.append(hulls[-1])
+        hulls = merged
+    return list(hulls[0]) if hulls else []
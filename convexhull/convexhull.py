@@ -1,5 +1,7 @@
 import math
 import sys
+import time
+from predicates import orient2d
 
 EPSILON = sys.float_info.epsilon
 
@@ -39,27 +41,27 @@ def triangleArea(a, b, c):
 Given three points a,b,c,
 returns True if and only if 
 a,b,c represents a clockwise sequence
-(subject to floating-point precision)
+(exactly, see predicates.orient2d)
 '''
 def cw(a, b, c):
-	return triangleArea(a,b,c) < EPSILON;
+	return orient2d(a, b, c) < 0
 '''
 Given three points a,b,c,
 returns True if and only if 
 a,b,c represents a counter-clockwise sequence
-(subject to floating-point precision)
+(exactly, see predicates.orient2d)
 '''
 def ccw(a, b, c):
-	return triangleArea(a,b,c) > EPSILON;
+	return orient2d(a, b, c) > 0
 
 '''
 Given three points a,b,c,
 returns True if and only if 
 a,b,c are collinear
-(subject to floating-point precision)
+(exactly, see predicates.orient2d)
 '''
 def collinear(a, b, c):
-	return abs(triangleArea(a,b,c)) <= EPSILON
+	return orient2d(a, b, c) == 0
 
 '''
 Given a list of points,
@@ -98,7 +100,8 @@ def compute_tangent(p1, p2):
 	return m, b
 
 # Find lower and upper tangent in O(n) by comparing points in left and right
-def find_tangent(left, right, which_tangent):
+# With a HullTrace (see hull_trace.py), the number of steps the walk takes (pointer advances) is recorded at the given recursion depth
+def find_tangent(left, right, which_tangent, trace = None, depth = 0):
 	# Save lambda function for finding upper and lower tangent
 	neighbor_relation = 0
 	if which_tangent == 'lower':
@@ -116,6 +119,7 @@ def find_tangent(left, right, which_tangent):
 
 	# Compute median point for tangent line between points at left_point and right_point
 	lower_tangent_found = False
+	steps = 0
 	while lower_tangent_found == False:
 		m, b = compute_tangent(left[left_point], right[right_point])
 
@@ -127,6 +131,7 @@ def find_tangent(left, right, which_tangent):
 			lower_tangent_found = True
 		else: 
 			left_point = left_point_left
+			steps += 1
 
 		# Check neighbors of right_point
 		right_point_left = circle_move(right_point, right, -1)
@@ -136,13 +141,16 @@ def find_tangent(left, right, which_tangent):
 			lower_tangent_found = True
 		else: 
 			right_point = right_point_right
+			steps += 1
 
 	# Return tuple of pointers whose points have lower tangent between left and right point sets
-	print((left_point, right_point))
+	if trace is not None: trace.walk(depth, which_tangent, steps)
 	return (left_point, right_point)
 
 
-def computeHull(points, initial = True):
+# Pass a HullTrace as trace to record every call, tangent walk and merge (depth counts the recursion levels above this call)
+def computeHull(points, initial = True, trace = None, depth = 0):
+	if trace is not None: trace.call(depth, len(points))
 	# If we only have three points, we have a triangle which is its own convex hull: return points
 	if len(points) <= 3: return points
 
@@ -151,14 +159,13 @@ def computeHull(points, initial = True):
 
 	# Divide points into two halves, recurse until base case
 	med = len(points) // 2
-	left = computeHull(points[: med], initial = False)
-	right = computeHull(points[med: ], initial = False)
-	print("Left: ", points[: med])
-	print("Right: ", points[med:])
+	left = computeHull(points[: med], initial = False, trace = trace, depth = depth + 1)
+	right = computeHull(points[med: ], initial = False, trace = trace, depth = depth + 1)
 
 	# Find lower and upper tangent tuples
-	lower_T = find_tangent(left, right, 'lower')
-	upper_T = find_tangent(left, right, 'upper')
+	if trace is not None: start = time.perf_counter()
+	lower_T = find_tangent(left, right, 'lower', trace, depth)
+	upper_T = find_tangent(left, right, 'upper', trace, depth)
 
 	left_point = lower_T[0]
 	right_point = upper_T[1]
@@ -174,20 +181,32 @@ def computeHull(points, initial = True):
 		merged_points.append(left[left_point])
 		left_point = circle_move(left_point, left, 1)
 
+	if trace is not None: trace.merge(depth, len(left), len(right), len(merged_points), time.perf_counter() - start)
 	return merged_points
 
 def orientation(p, q, r):
-    """Find the orientation of the triplet (p, q, r)."""
-    val = (q[1] - p[1]) * (r[0] - q[0]) - (q[0] - p[0]) * (r[1] - q[1])
+    """Find the orientation of the triplet (p, q, r), exactly (see predicates.orient2d)."""
+    val = orient2d(p, q, r)
     if val == 0:
         return 0  # colinear
-    elif val > 0:
+    elif val < 0:
         return 1  # clockwise
     else:
         return 2  # counterclockwise
 
-def convex_hull(points):
-    """Find the convex hull of a set of points."""
+def convex_hull(points, prefilter=False, stats=None):
+    """Find the convex hull of a set of points.
+
+    With prefilter=True, points strictly inside the Akl-Toussaint octagon are
+    discarded first (requires numpy); if stats is a dict, the number discarded
+    is stored in stats['prefilter_discarded'].
+    """
+    if prefilter:
+        from array_convexhull import prefilterPoints
+        points, discarded = prefilterPoints(points)
+        if stats is not None:
+            stats['prefilter_discarded'] = discarded
+
     n = len(points)
     if n < 3:
         return []  # not enough points for a hull
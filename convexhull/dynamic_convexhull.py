@@ -0,0 +1,186 @@
+from bisect import bisect_left, insort
+
+from hull_engines import monotoneChain
+from hull_tangents import merge
+from new_convexhull import computeHull, mergeHulls
+from predicates import orient2d
+
+'''
+Fully dynamic convex hull: points can be inserted and deleted, and the current
+hull is always available without a rebuild.
+The distinct points are kept in x-sorted buckets, each with its own hull, and a
+balanced binary tree over the buckets stores at every node the merge (hull_tangents.merge)
+of its two children, in the spirit of Overmars and van Leeuwen.
+An update recomputes one bucket hull and the O(log(n / B)) merges on its path to
+the root; the root holds the hull of everything. Buckets sit on fixed leaves with
+free leaves between and around them, so a bucket that splits takes a free leaf
+next to it and one that empties just leaves its leaf free: neither touches the
+other buckets' hulls. When a split finds no free leaf nearby (a window sliding
+along x uses up the free leaves on one side), the buckets are laid out over a
+new tree, keeping their hulls and redoing only the merges.
+'''
+
+# Target number of distinct points per bucket: buckets split at twice this size
+BUCKET_SIZE = 256
+
+
+# Longest run of buckets a split shifts over by one leaf to free the leaf it needs; past this the tree is laid out again
+SHIFT_LIMIT = 8
+
+
+# Below this many vertices in total, walking the tangents linearly beats the binary searches' overhead
+LINEAR_MERGE = 128
+
+
+# Merge two cyclic hulls of x-separated point sets, either of which may be empty
+# The bridges are found by binary search (hull_tangents.merge), so a merge near the root costs O(log^2(h)) tests plus the list slicing
+def combine(left_hull, right_hull):
+    if not left_hull: return right_hull
+    if not right_hull: return left_hull
+    if len(left_hull) + len(right_hull) <= LINEAR_MERGE: return mergeHulls(left_hull, right_hull, cyclic = True)
+    return merge(left_hull, right_hull)
+
+
+# Returns True if point is inside or on a counterclockwise hull of at least three points: O(h)
+def insideHull(hull, point):
+    return len(hull) >= 3 and all(orient2d(hull[i - 1], hull[i], point) >= 0 for i in range(len(hull)))
+
+
+class DynamicHull:
+    def __init__(self, points = (), bucket_size = BUCKET_SIZE):
+        if bucket_size < 1:
+            raise ValueError("bucket_size must be at least 1, got %r" % (bucket_size,))
+        self.bucket_size = bucket_size
+        self.counts = {}
+        for point in points:
+            point = tuple(point)
+            self.counts[point] = self.counts.get(point, 0) + 1
+        ordered = sorted(self.counts)
+        buckets = [ordered[i:i + bucket_size] for i in range(0, len(ordered), bucket_size)]
+        self.layout(buckets, [monotoneChain(bucket) for bucket in buckets])
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def __contains__(self, point):
+        return tuple(point) in self.counts
+
+    # Lay the non-empty buckets (with their hulls) out over the leaves of a new tree: two leaves apart, so every bucket has a free leaf
+    # to split into, and centred in a tree of at least four leaves per bucket, so a window sliding along x has free leaves ahead of it
+    # Only the merges are redone; the leaves keep their hulls. Empty leaves hold empty buckets and empty hulls
+    def layout(self, buckets, hulls):
+        self.size = 1
+        while self.size < 4 * len(buckets): self.size *= 2
+        offset = (self.size - 2 * len(buckets)) // 2
+        # Leaf of each non-empty bucket and that bucket's largest point, both in x order
+        self.slots = [offset + 2 * k for k in range(len(buckets))]
+        self.maxes = [bucket[-1] for bucket in buckets]
+        self.buckets = [[] for i in range(self.size)]
+        self.tree = [[] for i in range(2 * self.size)]
+        for leaf, bucket, bucket_hull in zip(self.slots, buckets, hulls):
+            self.buckets[leaf] = bucket
+            self.tree[self.size + leaf] = bucket_hull
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = combine(self.tree[2 * node], self.tree[2 * node + 1])
+
+    # Lay the current buckets out again, e.g. once a split finds no free leaf nearby or most leaves are empty
+    def relayout(self):
+        self.layout([self.buckets[leaf] for leaf in self.slots], [self.tree[self.size + leaf] for leaf in self.slots])
+
+    # Store the new hull of the bucket at leaf and redo the merges on its path to the root, stopping once a node's hull is unchanged
+    def update(self, leaf, bucket_hull):
+        node = self.size + leaf
+        if bucket_hull == self.tree[node]: return
+        self.tree[node] = bucket_hull
+        node //= 2
+        while node >= 1:
+            merged = combine(self.tree[2 * node], self.tree[2 * node + 1])
+            if merged == self.tree[node]: return
+            self.tree[node] = merged
+            node //= 2
+
+    # Redo the merges above a set of changed leaves, one level at a time so every node is merged once
+    def refresh(self, leaves):
+        nodes = {(self.size + leaf) // 2 for leaf in leaves} - {0}
+        while nodes:
+            for node in nodes:
+                self.tree[node] = combine(self.tree[2 * node], self.tree[2 * node + 1])
+            nodes = {node // 2 for node in nodes if node > 1}
+
+    # Position in self.slots of the bucket that holds (or should hold) point
+    def findBucket(self, point):
+        return min(bisect_left(self.maxes, point), len(self.slots) - 1)
+
+    # Split the k-th bucket, moving its upper half to the next leaf. If that leaf is taken, the run of buckets after it moves one leaf
+    # to the right when it is short and a free leaf ends it; otherwise the tree is laid out again. Only the two halves are re-hulled,
+    # with the monotone chain since a bucket is already sorted
+    def split(self, k):
+        leaf = self.slots[k]
+        end = k + 1
+        while end < len(self.slots) and self.slots[end] == leaf + end - k: end += 1
+        if end - k - 1 > SHIFT_LIMIT or leaf + end - k >= self.size:
+            self.relayout()
+            leaf, end = self.slots[k], k + 1
+        moved = []
+        for j in range(end - 1, k, -1):
+            old = self.slots[j]
+            self.buckets[old + 1], self.buckets[old] = self.buckets[old], []
+            self.tree[self.size + old + 1], self.tree[self.size + old] = self.tree[self.size + old], []
+            self.slots[j] = old + 1
+            moved.append(old + 1)
+        bucket = self.buckets[leaf]
+        low, high = bucket[:self.bucket_size], bucket[self.bucket_size:]
+        self.buckets[leaf], self.buckets[leaf + 1] = low, high
+        self.tree[self.size + leaf], self.tree[self.size + leaf + 1] = monotoneChain(low), monotoneChain(high)
+        self.slots.insert(k + 1, leaf + 1)
+        self.maxes[k:k + 1] = [low[-1], high[-1]]
+        self.refresh([leaf, leaf + 1] + moved)
+
+    # Insert one (x, y) point; repeated points are counted and do not touch the tree
+    def insert(self, point):
+        point = tuple(point)
+        if point in self.counts:
+            self.counts[point] += 1
+            return
+        self.counts[point] = 1
+        if not self.slots:
+            self.layout([[point]], [[point]])
+            return
+        k = self.findBucket(point)
+        leaf = self.slots[k]
+        insort(self.buckets[leaf], point)
+        if len(self.buckets[leaf]) > 2 * self.bucket_size:
+            self.split(k)
+        else:
+            self.maxes[k] = self.buckets[leaf][-1]
+            # A point inside the bucket hull changes nothing; otherwise the new bucket hull is the hull of the old one plus the point
+            bucket_hull = self.tree[self.size + leaf]
+            if not insideHull(bucket_hull, point):
+                self.update(leaf, computeHull(bucket_hull + [point], cyclic = True))
+
+    # Delete one copy of an (x, y) point, raising ValueError if it is not present
+    def delete(self, point):
+        point = tuple(point)
+        if point not in self.counts:
+            raise ValueError("%s is not in the hull's point set" % (point,))
+        self.counts[point] -= 1
+        if self.counts[point] > 0: return
+        del self.counts[point]
+        k = self.findBucket(point)
+        leaf = self.slots[k]
+        bucket = self.buckets[leaf]
+        del bucket[bisect_left(bucket, point)]
+        if not bucket:
+            # An emptied bucket leaves a free leaf behind; the tree shrinks once most of its leaves are free
+            del self.slots[k], self.maxes[k]
+            self.update(leaf, [])
+            if 16 * len(self.slots) <= self.size: self.relayout()
+        else:
+            self.maxes[k] = bucket[-1]
+            # Only deleting a vertex of the bucket hull forces the bucket to be recomputed
+            if point in self.tree[self.size + leaf]:
+                self.update(leaf, monotoneChain(bucket))
+
+    # The current hull, counterclockwise from the lexicographically smallest point (same order as computeHull(points, cyclic = True))
+    def hull(self):
+        return list(self.tree[1])
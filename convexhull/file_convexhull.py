@@ -0,0 +1,41 @@
+import numpy as np
+
+import array_convexhull
+from new_convexhull import computeHull
+
+'''
+Out-of-core convex hull over a binary point file that may not fit in memory.
+The file (raw little-endian float64 x, y pairs, or a .npy array of shape (N, 2))
+is memory-mapped and read one chunk at a time. Each chunk is hulled with the array
+engine, and only its hull vertices are folded into the running hull, so memory use
+is bounded by the chunk size plus the hull size.
+'''
+
+# Points read per chunk: 2^20 float64 pairs is 16 MB
+CHUNK_POINTS = 1 << 20
+
+
+# Memory-map a point file as an (N, 2) array without reading it
+def openPoints(path, dtype = np.float64):
+    if str(path).endswith('.npy'):
+        points = np.load(path, mmap_mode='r')
+    else:
+        points = np.memmap(path, dtype=dtype, mode='r')
+        if len(points) % 2 != 0:
+            raise ValueError("%s holds %d values, which is not a whole number of (x, y) pairs" % (path, len(points)))
+        points = points.reshape(-1, 2)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("%s does not hold an (N, 2) point array, got shape %s" % (path, points.shape))
+    return points
+
+
+# Convex hull of every point in a file, computed chunk by chunk: returns (x, y) tuples counterclockwise from the lexicographically smallest point
+# The chunks are not x-separated, so each chunk's hull vertices are folded into the running hull with computeHull (cyclic mode), whose merges only see hull vertices
+def fileHull(path, chunk_points = CHUNK_POINTS, dtype = np.float64, prefilter = True):
+    points = openPoints(path, dtype)
+    hull = []
+    for lo in range(0, len(points), chunk_points):
+        chunk = np.asarray(points[lo:lo + chunk_points])
+        vertices = chunk[array_convexhull.computeHull(chunk, prefilter = prefilter)]
+        hull = computeHull(hull + [tuple(p) for p in vertices.tolist()], cyclic = True)
+    return hull
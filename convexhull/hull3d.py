@@ -0,0 +1,190 @@
+import itertools
+
+import numpy as np
+
+from predicates import ORIENT3D_ERROR_BOUND, orient3d
+
+'''
+Convex hull of a 3D point cloud: the planar engines' divide and conquer has no
+cheap 3D merge, so this is the incremental Quickhull of Barber, Dobkin and Huhdanpaa.
+Starting from a tetrahedron of extreme points, every face keeps the set of points
+outside it (its conflict list). The farthest point of a face's set is added next:
+the faces it sees are removed, the horizon of edges around them is joined to the
+new vertex, and the points the removed faces held are handed to the new faces.
+
+The conflict lists are index arrays and are handed over with whole-array
+orientation tests (one per new face), so points inside the hull are dropped in bulk
+and never visited again. Only the handful of faces each new vertex sees are walked
+in Python. Orientation tests are exact: float determinants that do not clear
+Shewchuk's error bound are decided by predicates.orient3d.
+
+computeHull3d returns the mesh in compact arrays: the hull vertices as indices into
+the input points, and the faces as triangles of positions into that vertex array,
+counterclockwise seen from outside. A flat facet (a cube side, say) comes out
+triangulated, with no vertex in its interior or on its edges.
+'''
+
+# Orientation determinants and signs of the quadruples (a[k], b[k], c[k], d[k]) for arrays of indices into x, y and z (scalar indices are
+# broadcast): returns (det, signs), a sign 1 where d is outside face (a, b, c) (a, b, c counterclockwise seen from d), -1 inside, 0 coplanar
+# Float quadruples whose determinant is inside the rounding error bound are re-decided exactly by predicates.orient3d
+def orientationSigns3d(x, y, z, a, b, c, d):
+    ux, uy, uz = x[b] - x[a], y[b] - y[a], z[b] - z[a]
+    vx, vy, vz = x[c] - x[a], y[c] - y[a], z[c] - z[a]
+    wx, wy, wz = x[d] - x[a], y[d] - y[a], z[d] - z[a]
+    det = wx * (uy * vz - uz * vy) + wy * (uz * vx - ux * vz) + wz * (ux * vy - uy * vx)
+    signs = np.sign(det).astype(np.int8)
+    if det.dtype.kind == 'f':
+        bound = ORIENT3D_ERROR_BOUND * (np.abs(wx) * (np.abs(uy * vz) + np.abs(uz * vy)) + np.abs(wy) * (np.abs(uz * vx) + np.abs(ux * vz)) +
+                                        np.abs(wz) * (np.abs(ux * vy) + np.abs(uy * vx)))
+        uncertain = np.flatnonzero((np.abs(det) <= bound) & (bound > 0))
+        if len(uncertain): a, b, c, d = np.broadcast_arrays(a, b, c, d)
+        corner = lambda i: (x[i].item(), y[i].item(), z[i].item())
+        for k in uncertain.tolist():
+            signs[k] = orient3d(corner(a[k]), corner(b[k]), corner(c[k]), corner(d[k]))
+    return det, signs
+
+
+# Four points spanning a tetrahedron, as (a, b, c, d) with d on the inner side of face (a, b, c): raises ValueError if the points are coplanar
+def initialSimplex(x, y, z):
+    a = np.argmin(x)
+    b = np.argmax((x - x[a]) ** 2 + (y - y[a]) ** 2 + (z - z[a]) ** 2)
+    if x[a] == x[b] and y[a] == y[b] and z[a] == z[b]:
+        raise ValueError("3D hull needs points spanning a volume, but all %d points coincide" % len(x))
+    ux, uy, uz = x[b] - x[a], y[b] - y[a], z[b] - z[a]
+    wx, wy, wz = x - x[a], y - y[a], z - z[a]
+    c = np.argmax((uy * wz - uz * wy) ** 2 + (uz * wx - ux * wz) ** 2 + (ux * wy - uy * wx) ** 2)
+    det, signs = orientationSigns3d(x, y, z, a, b, c, np.arange(len(x)))
+    if not signs.any():
+        raise ValueError("3D hull needs points spanning a volume, but all %d points are coplanar" % len(x))
+    d = np.argmax(np.where(signs != 0, np.abs(det), -1))
+    if signs[d] > 0: b, c = c, b
+    return int(a), int(b), int(c), int(d)
+
+
+# Coplanar points are never outside a face, so a flat facet of the hull can come out as several triangles, with vertices
+# inside it or along its edges that are not extreme. flatFacets merges the edge-adjacent coplanar triangles of an (F, 3)
+# mesh and re-triangulates each merged facet as a fan over the 2D hull of its vertices, projected along its normal's largest axis
+def flatFacets(x, y, z, triangles):
+    m = len(triangles)
+    # Opposite vertex of the face across each directed edge (u, v), found by looking up the reversed edge (v, u)
+    u, v = triangles.ravel(), np.roll(triangles, -1, axis=1).ravel()
+    n = len(x)
+    keys = u.astype(np.int64) * n + v
+    order = np.argsort(keys)
+    across = order[np.searchsorted(keys, v.astype(np.int64) * n + u, sorter=order)]
+    opposite = triangles.ravel()[across - across % 3 + (across % 3 + 2) % 3]
+    face = np.repeat(np.arange(m), 3)
+    det, signs = orientationSigns3d(x, y, z, triangles[face, 0], triangles[face, 1], triangles[face, 2], opposite)
+    coplanar = np.flatnonzero(signs == 0)
+    if len(coplanar) == 0: return triangles
+
+    # Union-find over the coplanar edges
+    parent = list(range(m))
+    def root(f):
+        while parent[f] != f:
+            parent[f] = parent[parent[f]]
+            f = parent[f]
+        return f
+    for k in coplanar.tolist():
+        parent[root(face[k])] = root(across[k] // 3)
+    facets = {}
+    for f in np.unique(face[coplanar]).tolist():
+        facets.setdefault(root(f), []).append(f)
+
+    from hull_engines import monotoneChainHull
+    merged = np.ones(m, dtype=bool)
+    fans = []
+    for members in facets.values():
+        merged[members] = False
+        a, b, c = triangles[members[0]]
+        normal = np.cross([x[b] - x[a], y[b] - y[a], z[b] - z[a]], [x[c] - x[a], y[c] - y[a], z[c] - z[a]])
+        axis = int(np.argmax(np.abs(normal)))
+        # Dropping one coordinate keeps the plane's orientation if the other two stay in cyclic order
+        first, second = [(1, 2), (2, 0), (0, 1)][axis]
+        columns = (x, y, z)
+        corners = np.unique(triangles[members])
+        projected = {(columns[first][i].item(), columns[second][i].item()): i for i in corners.tolist()}
+        polygon = [projected[point] for point in monotoneChainHull(list(projected))]
+        if normal[axis] < 0: polygon.reverse()
+        fans.extend((polygon[0], polygon[k], polygon[k + 1]) for k in range(1, len(polygon) - 1))
+    return np.concatenate((triangles[merged], np.array(fans, dtype=triangles.dtype).reshape(-1, 3)))
+
+
+# Convex hull of an (N, 3) array: returns (vertices, faces), vertices the sorted indices of the hull vertices into points and faces an (F, 3)
+# array of positions into vertices, each triangle counterclockwise seen from outside
+# Needs at least four points that are not coplanar (ValueError otherwise): O(n log(n)) expected
+def computeHull3d(points):
+    points = np.asarray(points)
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError("points must be an (N, 3) array, got shape %s" % (points.shape,))
+    if len(points) < 4:
+        raise ValueError("3D hull needs at least 4 points, got %d" % len(points))
+    x, y, z = points[:, 0], points[:, 1], points[:, 2]
+    if not np.issubdtype(points.dtype, np.integer):
+        x, y, z = x.astype(np.float64), y.astype(np.float64), z.astype(np.float64)
+    # Coordinates of hull vertices as Python numbers for the scalar predicate, each converted once however many faces it is on
+    vertex_coordinates = {}
+    def coordinates(i):
+        if i not in vertex_coordinates: vertex_coordinates[i] = (x[i].item(), y[i].item(), z[i].item())
+        return vertex_coordinates[i]
+
+    # Face id --> (a, b, c); directed edge (u, v) --> id of the face it bounds counterclockwise; face id --> (conflict indices, determinants)
+    faces, edges, conflicts = {}, {}, {}
+    pending = []
+    def addFace(face, candidates):
+        face_id = next(ids)
+        faces[face_id] = face
+        a, b, c = face
+        edges[(a, b)], edges[(b, c)], edges[(c, a)] = face_id, face_id, face_id
+        if len(candidates) == 0: return candidates
+        det, signs = orientationSigns3d(x, y, z, *face, candidates)
+        outside = signs > 0
+        if outside.any():
+            conflicts[face_id] = (candidates[outside], det[outside])
+            pending.append(face_id)
+        return candidates[~outside]
+
+    ids = itertools.count()
+    a, b, c, d = initialSimplex(x, y, z)
+    rest = np.ones(len(x), dtype=bool)
+    rest[[a, b, c, d]] = False
+    rest = np.flatnonzero(rest)
+    for face in ((a, b, c), (a, d, b), (b, d, c), (c, d, a)):
+        rest = addFace(face, rest)
+
+    while pending:
+        face_id = pending.pop()
+        if face_id not in faces: continue
+        candidates, det = conflicts.pop(face_id)
+        apex = candidates[np.argmax(det)]
+        point = coordinates(apex)
+
+        # Faces visible from the apex form a connected cap: walk it, collecting the horizon edges where a visible face meets a hidden one
+        visible, cap, hidden = [face_id], {face_id}, set()
+        horizon = []
+        for visible_id in visible:
+            u, v, w = faces[visible_id]
+            for edge in ((u, v), (v, w), (w, u)):
+                neighbour = edges[(edge[1], edge[0])]
+                if neighbour in cap: continue
+                if neighbour not in hidden and orient3d(*map(coordinates, faces[neighbour]), point) > 0:
+                    cap.add(neighbour)
+                    visible.append(neighbour)
+                else:
+                    hidden.add(neighbour)
+                    horizon.append(edge)
+
+        # Remove the cap, keeping the points its faces held, then cone the horizon to the apex and hand the points to the new faces
+        held = [candidates]
+        for visible_id in visible:
+            u, v, w = faces.pop(visible_id)
+            del edges[(u, v)], edges[(v, w)], edges[(w, u)]
+            if visible_id in conflicts: held.append(conflicts.pop(visible_id)[0])
+        rest = np.concatenate(held)
+        rest = rest[rest != apex]
+        for u, v in horizon:
+            rest = addFace((u, v, apex), rest)
+
+    triangles = flatFacets(x, y, z, np.array(list(faces.values())))
+    vertices = np.unique(triangles)
+    return vertices, np.searchsorted(vertices, triangles)
@@ -2,8 +2,7 @@
 # if using python 3, swap the next two lines
 # from tkinter import *
 from Tkinter import *
-import copy
-from convexhull import computeHull
+from incremental_convexhull import IncrementalHull
 
 
 def hello(event):
@@ -12,6 +11,7 @@ def hello(event):
 def addPoint(event):
 	drawPoint(w, event.x, event.y)
 	points.append((event.x,event.y))
+	online_hull.add((event.x,event.y))
 
 def drawPoint(canvas,x,y):
 	# r = 4
@@ -23,7 +23,8 @@ def showPoints(event):
 	print(points)
 
 def drawHull():
-	hull = copy.copy(computeHull(points))
+	hull = online_hull.hull()
+	if not hull: return
 	hull.append(hull[0])
 	for i in range(0,len(hull)-1):
 		x1 = hull[i][0]
@@ -35,6 +36,7 @@ def drawHull():
 
 master = Tk()
 points = []
+online_hull = IncrementalHull()
 
 submit_button = Button(master, text="Draw Hull", command=drawHull)
 submit_button.pack()
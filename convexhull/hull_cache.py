@@ -0,0 +1,137 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from incremental_convexhull import IncrementalHull
+
+'''
+Memoizing layer for the hull entry points. HullCache wraps any hull function
+(hull_engines.hull, new_convexhull.computeHull, array_convexhull.computeHull, ...)
+and remembers its results, keyed on a fingerprint of the point buffer and the
+keyword options, in a bounded least-recently-used table:
+
+    cachedHull = HullCache(hull_engines.hull, max_entries = 64)
+    cachedHull(points, algorithm = 'chan')
+
+An input that is a cached input with more points appended is also a hit when every
+appended point lies inside or on the cached hull, since the hull cannot have changed.
+Calls with collinear = True are never such hits: their results list the points on
+hull edges too, so a point appended on the boundary changes them.
+'''
+
+# Fingerprints are 128-bit blake2b digests
+DIGEST_SIZE = 16
+
+
+# Fingerprint of a point buffer: returns (digest of all points, {k: digest of the first k points} for each k in lengths below len(points))
+# The buffer is hashed in a single pass, taking a copy of the hash state at every requested prefix length
+def fingerprints(points, lengths = ()):
+    array = points if isinstance(points, np.ndarray) else np.asarray(points)
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    numeric = array.ndim == 2 and array.dtype.kind in 'iuf'
+    # A list mixing floats with ints beyond 2^53 converts lossily, so distinct inputs could share bytes
+    if numeric and array is not points and array.dtype.kind == 'f' and array.size and np.abs(array).max() >= 2.0 ** 53:
+        numeric = False
+    if numeric:
+        # Numeric (N, 2) buffer: hash the raw rows, so a prefix of points is a prefix of the bytes
+        array = np.ascontiguousarray(array)
+        hasher.update(array.dtype.str.encode())
+        rows = memoryview(array.reshape(-1).view(np.uint8)).cast('B')
+        row_bytes = array.itemsize * array.shape[1] if array.size else 0
+        feed = lambda lo, hi: hasher.update(rows[lo * row_bytes:hi * row_bytes])
+    else:
+        # Anything else (Python ints too large for int64, mixed types): hash each point's repr
+        hasher.update(b'repr')
+        feed = lambda lo, hi: [hasher.update(repr(tuple(points[i])).encode()) for i in range(lo, hi)]
+    prefixes = {}
+    done = 0
+    for k in sorted(set(lengths)):
+        if k >= len(points): break
+        feed(done, k)
+        done = k
+        prefixes[k] = hasher.copy().digest()
+    feed(done, len(points))
+    return hasher.digest(), prefixes
+
+
+class HullCache:
+    # function(points, **options) computes a hull; with indices = True it returns indices into points rather than the points themselves
+    def __init__(self, function, max_entries = 128, indices = False):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1, got %r" % (max_entries,))
+        self.function = function
+        self.max_entries = max_entries
+        self.indices = indices
+        self.entries = OrderedDict()
+        # Number of cached entries per input length: the prefix lengths worth fingerprinting on a miss
+        self.lengths = {}
+        self.hits = 0
+        self.misses = 0
+        # Hits found by extending a cached input with interior points (also counted in hits)
+        self.appended_hits = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Hull of points, computed by the wrapped function or taken from the cache
+    def __call__(self, points, **options):
+        option_key = tuple(sorted(options.items()))
+        try:
+            hash(option_key)
+        except TypeError:
+            # Unhashable options (such as a stats dict to fill in) cannot be keyed: always call through
+            self.misses += 1
+            return self.function(points, **options)
+        digest, prefixes = fingerprints(points, self.lengths)
+        key = (len(points), digest, option_key)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.copy(self.entries[key])
+
+        # Longest cached prefix whose hull already contains every appended point (boundary points count in collinear mode, so it is skipped)
+        for k in ([] if options.get('collinear') else sorted(prefixes, reverse=True)):
+            prefix_key = (k, prefixes[k], option_key)
+            if prefix_key in self.entries and self.containsAll(self.entries[prefix_key], points, k):
+                self.entries.move_to_end(prefix_key)
+                self.hits += 1
+                self.appended_hits += 1
+                self.store(key, self.entries[prefix_key])
+                return self.copy(self.entries[prefix_key])
+
+        self.misses += 1
+        result = self.function(points, **options)
+        self.store(key, self.copy(result))
+        return result
+
+    # Returns True if every point after the first k lies inside or on the hull cached for points[:k]: O(h log(h) + (n - k) log(h))
+    def containsAll(self, result, points, k):
+        if self.indices:
+            vertices = [tuple(points[i]) for i in np.asarray(result).tolist()]
+        else:
+            vertices = [tuple(vertex) for vertex in result]
+        if not vertices: return False
+        online_hull = IncrementalHull(vertices)
+        return all(online_hull.contains(points[i]) for i in range(k, len(points)))
+
+    # Callers own what they are given (hullGUI.drawHull appends to its hull list), so results go in and out as copies
+    def copy(self, result):
+        return result.copy() if isinstance(result, np.ndarray) else list(result)
+
+    def store(self, key, result):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return
+        self.entries[key] = result
+        self.lengths[key[0]] = self.lengths.get(key[0], 0) + 1
+        while len(self.entries) > self.max_entries:
+            old_key, old_result = self.entries.popitem(last=False)
+            self.lengths[old_key[0]] -= 1
+            if self.lengths[old_key[0]] == 0: del self.lengths[old_key[0]]
+
+    # Drop every entry and reset the counters
+    def clear(self):
+        self.entries.clear()
+        self.lengths.clear()
+        self.hits = self.misses = self.appended_hits = 0
@@ -0,0 +1,124 @@
+from new_convexhull import computeHull, computeHullBottomUp, findOrientation, isBeyond
+from predicates import orient2d
+
+'''
+Common entry point for the hull algorithms: hull(points, algorithm = ...) returns
+the hull of a list of (x, y) points as a list of points, counterclockwise from the
+lexicographically smallest point, whichever engine computes it.
+'''
+
+# Andrew's monotone chain over sorted, distinct points: lower chain left to right, then upper chain right to left
+# With exact_ints the cross product is inlined: Python ints never round, so no predicate call is needed
+def monotoneChain(ordered, exact_ints = False):
+    if len(ordered) <= 2: return list(ordered)
+    hull = []
+    for chain in (ordered, ordered[::-1]):
+        half = []
+        if exact_ints:
+            for c in chain:
+                while len(half) >= 2:
+                    a, b = half[-2], half[-1]
+                    if (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]) > 0: break
+                    half.pop()
+                half.append(c)
+        else:
+            for c in chain:
+                while len(half) >= 2 and orient2d(half[-2], half[-1], c) <= 0:
+                    half.pop()
+                half.append(c)
+        hull.extend(half[:-1])
+    return hull
+
+
+# Returns True if every coordinate is a Python int, so monotoneChain can use exact inline arithmetic
+def allInts(points):
+    return all(type(x) is int and type(y) is int for x, y in points)
+
+
+# Monotone-chain engine: the same lexicographic sort computeHull does, then two linear scans with no angular sort
+def monotoneChainHull(points):
+    ordered = sorted(set(points))
+    return monotoneChain(ordered, allInts(ordered))
+
+
+# Returns True if, seen from p, candidate c is a better next hull vertex than q: c is right of p -> q, or on that line and further away
+def isBetterWrap(p, q, c):
+    orientation = findOrientation(p, q, c)
+    return orientation > 0 or (orientation == 0 and isBeyond(p, q, c))
+
+
+# One round of Chan's algorithm over precomputed group hulls: returns the hull, or None if it has more than m vertices
+def chanRound(groups, m, start):
+    # Each group keeps a pointer to its tangent point; as the wrap goes counterclockwise around the hull
+    # the tangent points only move counterclockwise too, so each pointer walks at most once around its group
+    pointers = []
+    for group in groups:
+        best = 0
+        for i in range(1, len(group)):
+            if group[best] == start or isBetterWrap(start, group[best], group[i]): best = i
+        pointers.append(best)
+
+    hull = [start]
+    p = start
+    for step in range(m):
+        candidate = None
+        for g in range(len(groups)):
+            group, i = groups[g], pointers[g]
+            size = len(group)
+            if group[i] == p:
+                if size == 1: continue
+                i = (i + 1) % size
+            while size > 1 and isBetterWrap(p, group[i], group[(i + 1) % size]):
+                i = (i + 1) % size
+            pointers[g] = i
+            if candidate is None or isBetterWrap(p, candidate, group[i]): candidate = group[i]
+        if candidate is None or candidate == start: return hull
+        hull.append(candidate)
+        p = candidate
+    return None
+
+
+# Chan's rounds use group size m = 2^(2^t) starting from this t: rounds with groups of 4 or 16 points cost a full pass
+# of per-group Python overhead each, more than the smaller log(m) saves
+FIRST_ROUND = 3
+
+
+# Chan's output-sensitive algorithm: O(n log(h)) for h hull vertices
+# Group hulls are computed with the monotone chain and joined by a Jarvis wrap over the groups
+def chanHull(points):
+    points = list(set(points))
+    if len(points) <= 2: return sorted(points)
+    start = min(points)
+    exact_ints = allInts(points)
+    t = FIRST_ROUND
+    while True:
+        m = min(2 ** (2 ** t), len(points))
+        groups = [monotoneChain(sorted(points[i:i + m]), exact_ints) for i in range(0, len(points), m)]
+        hull = chanRound(groups, m, start)
+        if hull is not None: return hull
+        # Points that are not on their group's hull are interior: the next, larger round only needs the group hull vertices
+        points = [point for group in groups for point in group]
+        t += 1
+
+
+# Vectorized Quickhull engine (see quickhull.py): imported on first use, since it needs numpy
+def quickHull(points):
+    import quickhull
+    return quickhull.quickHull(points)
+
+
+# Algorithm name --> function taking a list of (x, y) points and returning the hull in canonical order
+ALGORITHMS = {
+    'divide_and_conquer': lambda points: computeHull(points, cyclic = True),
+    'bottom_up': computeHullBottomUp,
+    'chan': chanHull,
+    'monotone_chain': monotoneChainHull,
+    'quickhull': quickHull,
+}
+
+
+# Convex hull of a list of (x, y) points with the chosen algorithm (see ALGORITHMS)
+def hull(points, algorithm = 'divide_and_conquer'):
+    if algorithm not in ALGORITHMS:
+        raise ValueError("unknown hull algorithm %r, expected one of %s" % (algorithm, sorted(ALGORITHMS)))
+    return ALGORITHMS[algorithm](points)
@@ -0,0 +1,82 @@
+import numpy as np
+
+from array_convexhull import coordinateColumns, orientationSigns
+from hull_engines import monotoneChainHull
+from hull_tangents import pointTangents
+from predicates import orient2d
+
+'''
+Point-in-hull queries against a fixed hull. HullIndex takes the vertices returned
+by any hull engine (computeHull, convex_hull, hull_engines.hull, ...), in either
+rotational direction, and puts them in canonical counterclockwise order from the
+lexicographically smallest vertex v0. The triangles (v0, v[i], v[i + 1]) form a
+fan covering the hull, so a query finds its triangle by binary search over the
+angles around v0 and then makes one edge test: O(log(h)) per point.
+Points on the boundary count as inside. Tangents from outside points are found by
+binary search as well (hull_tangents.pointTangents).
+'''
+
+class HullIndex:
+    def __init__(self, hull):
+        # Re-hulling the h vertices is O(h log(h)) and makes any vertex order, closing repeat or collinear run acceptable
+        # Rows of an array become tuples of Python numbers, which the scalar predicates compute with directly
+        rows = hull.tolist() if isinstance(hull, np.ndarray) else hull
+        self.vertices = monotoneChainHull([tuple(vertex) for vertex in rows])
+        self.array = np.array(self.vertices) if self.vertices else np.zeros((0, 2))
+
+    def __len__(self):
+        return len(self.vertices)
+
+    # Returns True if point lies inside or on the hull: O(log(h))
+    def __contains__(self, point):
+        point = tuple(point)
+        vertices = self.vertices
+        h = len(vertices)
+        if h <= 2:
+            if h == 0: return False
+            if h == 1: return point == vertices[0]
+            return orient2d(vertices[0], vertices[1], point) == 0 and vertices[0] <= point <= vertices[1]
+        origin = vertices[0]
+        # Outside the wedge at v0 spanned by its two hull edges
+        if orient2d(origin, vertices[1], point) < 0 or orient2d(origin, vertices[-1], point) > 0: return False
+        # Last fan edge v[lo] whose ray from v0 has the point on its left (or on it)
+        lo, hi = 1, h - 1
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if orient2d(origin, vertices[mid], point) >= 0: lo = mid
+            else: hi = mid
+        return orient2d(vertices[lo], vertices[hi], point) >= 0
+
+    # The two vertices where the tangents from an outside point touch the hull, or None if point is inside or on it: O(log(h))
+    # The first is where the hull edges facing the point begin (counterclockwise) and the second where they end
+    def tangents(self, point):
+        found = pointTangents(self.vertices, point)
+        return None if found is None else (self.vertices[found[0]], self.vertices[found[1]])
+
+    # Vectorized containment for an (N, 2) array of query points: returns a boolean array, True inside or on the hull
+    # All queries take the same ceil(log2(h)) binary search steps as whole-array operations
+    def contains(self, points):
+        points = np.asarray(points)
+        if points.ndim != 2 or points.shape[1] != 2:
+            raise ValueError("points must be an (N, 2) array, got shape %s" % (points.shape,))
+        h, n = len(self.vertices), len(points)
+        if h <= 2:
+            return np.array([tuple(point) in self for point in points.tolist()], dtype=bool)
+
+        # Vertices and queries share one coordinate array so orientationSigns can address both by index
+        x, y = coordinateColumns(np.concatenate((self.array, points)))
+        queries = np.arange(h, h + n)
+        inside = (orientationSigns(x, y, np.zeros(n, dtype=np.int64), np.ones(n, dtype=np.int64), queries) >= 0) & \
+                 (orientationSigns(x, y, np.zeros(n, dtype=np.int64), np.full(n, h - 1), queries) <= 0)
+        # Only queries inside the wedge at v0 are searched: for them the fan edge v[lo] always has the query on its left
+        queries = queries[inside]
+        origin = np.zeros(len(queries), dtype=np.int64)
+        lo = np.ones(len(queries), dtype=np.int64)
+        hi = np.full(len(queries), h - 1)
+        for step in range((h - 2).bit_length()):
+            mid = (lo + hi) // 2
+            left = orientationSigns(x, y, origin, mid, queries) >= 0
+            lo = np.where(left, mid, lo)
+            hi = np.where(left, hi, mid)
+        inside[inside] = orientationSigns(x, y, lo, hi, queries) >= 0
+        return inside
@@ -0,0 +1,131 @@
+from predicates import orient2d
+
+'''
+Binary-search tangent queries on hulls in the engines' canonical order
+(counterclockwise from the lexicographically smallest vertex, no collinear vertices).
+pointTangents(hull, point) finds the two vertices where the tangents from an outside
+point touch the hull in O(log(h)), and merge(left_hull, right_hull) joins the hulls of
+two x-separated point sets by finding both bridges with nested binary searches,
+O(log^2(h)) orientation tests instead of findTangents' linear walks.
+
+A canonical hull splits at its lexicographically largest vertex hull[r] into the lower
+chain hull[0..r] and the upper chain hull[r..h-1], hull[0]. Every search below runs
+along one chain, where the predicate tested is monotone. The upper chain is handled
+as the lower chain of the hull rotated by 180 degrees, so each search is written once.
+'''
+
+# Smallest k in [lo, hi) with test(k) true, or hi if there is none; test must be false up to some k and true from there on
+def firstTrue(lo, hi, test):
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if test(mid): hi = mid
+        else: lo = mid + 1
+    return lo
+
+
+# Index of the lexicographically largest vertex of a canonical hull, where the lower chain ends: O(log(h))
+def rightmostIndex(hull):
+    return firstTrue(0, len(hull) - 1, lambda k: hull[k] > hull[k + 1])
+
+
+# Vertex accessor for the hull rotated by 180 degrees about the origin, renumbered so that the rotation of hull[r] is vertex 0
+# The rotation keeps the hull counterclockwise and turns its upper chain into the lower chain
+def rotatedView(hull, r):
+    h = len(hull)
+    return lambda k: (-hull[(r + k) % h][0], -hull[(r + k) % h][1])
+
+
+# Tangents from a point left of the hull's vertical extent (or on its leftmost vertical line but off the hull): returns (i, j)
+# as in pointTangents. The edges facing the point are a prefix of the lower chain and a suffix of the upper chain
+def leftTangents(at, h, r, point):
+    visible = lambda k: orient2d(at(k), at((k + 1) % h), point) <= 0
+    last_lower = firstTrue(0, r, lambda k: not visible(k)) - 1
+    first_upper = firstTrue(r, h, visible)
+    return first_upper % h, (last_lower + 1) % h
+
+
+# Tangents from a point strictly below the lower chain, between the hull's leftmost and rightmost x: returns (i, j) as in
+# pointTangents, or None if the point is not below. The edges facing the point are a run of the lower chain around the edge above it
+def belowTangents(at, h, r, point):
+    above = firstTrue(0, r, lambda k: at(k)[0] >= point[0]) - 1
+    if orient2d(at(above), at(above + 1), point) >= 0: return None
+    visible = lambda k: orient2d(at(k), at(k + 1), point) <= 0
+    return firstTrue(0, above, visible), firstTrue(above, r, lambda k: not visible(k))
+
+
+# Tangents from point to a canonical hull: returns (i, j) such that the edges from hull[i] counterclockwise to hull[j] are the
+# ones facing the point, so the hull of hull + [point] is hull[j], ..., hull[i] (counterclockwise, wrapping) followed by point.
+# A vertex collinear with the point and a tangent vertex further away is not a tangent vertex itself.
+# Returns None if point lies inside or on the hull: O(log(h))
+def pointTangents(hull, point):
+    point = tuple(point)
+    h = len(hull)
+    if h == 0: return None
+    if h == 1: return None if point == hull[0] else (0, 0)
+    if h == 2:
+        turn = orient2d(hull[0], hull[1], point)
+        if turn > 0: return 1, 0
+        if turn < 0: return 0, 1
+        if hull[0] <= point <= hull[1]: return None
+        far = 1 if point < hull[0] else 0
+        return far, far
+
+    r = rightmostIndex(hull)
+    rotated = rotatedView(hull, r)
+    turned = (-point[0], -point[1])
+    unrotate = lambda tangents: ((tangents[0] + r) % h, (tangents[1] + r) % h)
+    x_left, x_right = hull[0][0], hull[r][0]
+    # The hull's leftmost and rightmost sides, which are single vertices unless the hull has a vertical edge there
+    left_top = hull[-1] if hull[-1][0] == x_left else hull[0]
+    right_bottom = hull[r - 1] if hull[r - 1][0] == x_right else hull[r]
+    if point[0] < x_left or (point[0] == x_left and not hull[0] <= point <= left_top):
+        return leftTangents(hull.__getitem__, h, r, point)
+    if point[0] > x_right or (point[0] == x_right and not right_bottom <= point <= hull[r]):
+        return unrotate(leftTangents(rotated, h, (h - r) % h, turned))
+    if point[0] == x_left or point[0] == x_right: return None
+
+    tangents = belowTangents(hull.__getitem__, h, r, point)
+    if tangents is not None: return tangents
+    tangents = belowTangents(rotated, h, (h - r) % h, turned)
+    if tangents is not None: return unrotate(tangents)
+    return None
+
+
+# Lower bridge between hulls given as vertex accessors, every vertex of the left one lexicographically smaller than every vertex
+# of the right one: returns (i, j), the bridge running from left vertex i on its lower chain to right vertex j on its lower chain
+def lowerBridge(left, left_r, right, right_r):
+    # Where the lower tangent from u touches the right hull: the first lower-chain vertex after which the chain turns away from u
+    tangent = lambda u: firstTrue(0, right_r, lambda k: orient2d(u, right(k), right(k + 1)) > 0)
+    # Left vertex i is the bridge end once its successor on the lower chain is on or above the tangent from it
+    bridged = lambda i: i == left_r or orient2d(left(i), right(tangent(left(i))), left(i + 1)) >= 0
+    i = firstTrue(0, left_r, bridged)
+    return i, tangent(left(i))
+
+
+# Hull of the union of two canonical hulls whose point sets are x-separated (all of one lexicographically smaller than all of the other),
+# in canonical order: the same result as mergeHulls(left_hull, right_hull, cyclic = True), but each bridge is found in O(log^2(h))
+# orientation tests, so only the slicing that builds the result is linear
+def merge(left_hull, right_hull):
+    if not left_hull: return list(right_hull)
+    if not right_hull: return list(left_hull)
+    left_r, right_r = rightmostIndex(left_hull), rightmostIndex(right_hull)
+    if right_hull[right_r] < left_hull[0]:
+        left_hull, right_hull, left_r, right_r = right_hull, left_hull, right_r, left_r
+    elif not left_hull[left_r] < right_hull[0]:
+        raise ValueError("hulls to merge must be x-separated: %s is not left of %s" % (left_hull[left_r], right_hull[0]))
+    n, m = len(left_hull), len(right_hull)
+
+    lower_left, lower_right = lowerBridge(left_hull.__getitem__, left_r, right_hull.__getitem__, right_r)
+    # The upper bridge is the lower bridge of the rotated hulls, where the right hull is now on the left
+    upper_right, upper_left = lowerBridge(rotatedView(right_hull, right_r), (m - right_r) % m, rotatedView(left_hull, left_r), (n - left_r) % n)
+    upper_right, upper_left = (upper_right + right_r) % m, (upper_left + left_r) % n
+
+    # Left lower chain up to the bridge, right hull counterclockwise between its bridge ends, then the rest of the left upper chain
+    merged = left_hull[:lower_left + 1]
+    if upper_right >= lower_right:
+        merged += right_hull[lower_right:upper_right + 1]
+    else:
+        merged += right_hull[lower_right:] + right_hull[:upper_right + 1]
+    if upper_left != 0:
+        merged += left_hull[max(upper_left, lower_left + 1):]
+    return merged
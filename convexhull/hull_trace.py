@@ -0,0 +1,49 @@
+'''
+Opt-in tracing for the recursive divide and conquer hulls (best_convexhull_code_yet
+and convexhull). Pass a HullTrace as computeHull(points, trace = ...) and it collects
+one record per recursive call, per tangent walk and per merge, instead of the
+engines printing their intermediate hulls. With trace = None (the default) nothing
+is recorded or timed.
+
+    trace = HullTrace()
+    best_convexhull_code_yet.computeHull(points, trace = trace)
+    for depth, level in sorted(trace.levels().items()): print(depth, level)
+'''
+
+class HullTrace:
+    def __init__(self):
+        # (depth, number of points) for every computeHull call
+        self.calls = []
+        # (depth, which tangent, steps taken) for every tangent walk, a step being one advance of either pointer
+        self.walks = []
+        # (depth, left hull size, right hull size, merged hull size, seconds) for every merge
+        self.merges = []
+
+    def call(self, depth, size):
+        self.calls.append((depth, size))
+
+    def walk(self, depth, which, steps):
+        self.walks.append((depth, which, steps))
+
+    def merge(self, depth, left_size, right_size, merged_size, seconds):
+        self.merges.append((depth, left_size, right_size, merged_size, seconds))
+
+    # Deepest recursion level reached (the top-level call is depth 0), or -1 if nothing was traced
+    def maxDepth(self):
+        return max((depth for depth, size in self.calls), default=-1)
+
+    # Per-level totals: depth --> {'calls', 'points', 'merges', 'merged_points', 'tangent_steps', 'merge_seconds'}
+    def levels(self):
+        levels = {}
+        def level(depth):
+            return levels.setdefault(depth, {'calls': 0, 'points': 0, 'merges': 0, 'merged_points': 0, 'tangent_steps': 0, 'merge_seconds': 0.0})
+        for depth, size in self.calls:
+            level(depth)['calls'] += 1
+            level(depth)['points'] += size
+        for depth, which, steps in self.walks:
+            level(depth)['tangent_steps'] += steps
+        for depth, left_size, right_size, merged_size, seconds in self.merges:
+            level(depth)['merges'] += 1
+            level(depth)['merged_points'] += merged_size
+            level(depth)['merge_seconds'] += seconds
+        return levels
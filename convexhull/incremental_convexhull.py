@@ -0,0 +1,159 @@
+from bisect import bisect_left
+
+from predicates import orient2d
+
+'''
+Online convex hull: points arrive one at a time (or in batches) and the hull is
+updated in place instead of being recomputed from scratch.
+The hull is kept as its lower and upper chains, each sorted by (x, y) in a
+BlockedChain: a list of sorted blocks of at most 2 * CHAIN_LOAD points, found by
+binary search over the blocks' last points, so an insertion or deletion shifts one
+block rather than the whole chain.
+A new point is located in each chain by binary search and a single orientation
+test tells whether it is inside; otherwise it is inserted and the neighbours it
+makes non-convex are removed. Every point is removed at most once, so an update
+takes amortized O(log(h)) comparisons plus O(CHAIN_LOAD) element moves, with an
+O(h / CHAIN_LOAD) reshuffle of the block index whenever a block splits or joins its neighbour.
+'''
+
+# Target number of points per chain block: blocks split above twice this size and join a neighbour below half of it
+CHAIN_LOAD = 128
+
+
+class BlockedChain:
+    def __init__(self):
+        self.blocks = []
+        # Last (largest) point of every block, for the binary search over blocks
+        self.maxes = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for block in self.blocks:
+            yield from block
+
+    # Block and offset where point is or would be inserted (bisect_left over the whole chain); past the end if it is larger than every point
+    def locate(self, point):
+        b = bisect_left(self.maxes, point)
+        if b == len(self.blocks): return b - 1, len(self.blocks[-1])
+        return b, bisect_left(self.blocks[b], point)
+
+    # The chain points just before and at or after point, without copying any: None past either end
+    def around(self, point):
+        if not self.blocks: return None, None
+        b = bisect_left(self.maxes, point)
+        if b == len(self.blocks): return self.blocks[-1][-1], None
+        block = self.blocks[b]
+        j = bisect_left(block, point)
+        return block[j - 1] if j else self.blocks[b - 1][-1] if b else None, block[j]
+
+    # Up to count chain points smaller than point (the nearest one last) and up to count at or after it (point itself first if present), with one lookup
+    def window(self, point, count):
+        if not self.blocks: return [], []
+        b, j = self.locate(point)
+        smaller, larger = self.blocks[b][max(0, j - count):j], self.blocks[b][j:j + count]
+        k = b
+        while len(smaller) < count and k > 0:
+            k -= 1
+            smaller = self.blocks[k][max(0, len(self.blocks[k]) - count + len(smaller)):] + smaller
+        k = b
+        while len(larger) < count and k + 1 < len(self.blocks):
+            k += 1
+            larger += self.blocks[k][:count - len(larger)]
+        return smaller, larger
+
+    # Insert a point that is not in the chain
+    def add(self, point):
+        self.size += 1
+        if not self.blocks:
+            self.blocks.append([point])
+            self.maxes.append(point)
+            return
+        b, j = self.locate(point)
+        self.blocks[b].insert(j, point)
+        self.maxes[b] = self.blocks[b][-1]
+        self.balance(b)
+
+    # Delete a point that is in the chain
+    def remove(self, point):
+        self.size -= 1
+        b, j = self.locate(point)
+        del self.blocks[b][j]
+        if not self.blocks[b]:
+            del self.blocks[b]
+            del self.maxes[b]
+            b = min(b, len(self.blocks) - 1)
+            if b < 0: return
+        self.maxes[b] = self.blocks[b][-1]
+        self.balance(b)
+
+    # Split block b in half if it grew past 2 * CHAIN_LOAD, or join it to a neighbour if it shrank below CHAIN_LOAD // 2
+    def balance(self, b):
+        block = self.blocks[b]
+        if len(block) < CHAIN_LOAD // 2 and len(self.blocks) > 1:
+            b = b if b + 1 < len(self.blocks) else b - 1
+            block = self.blocks[b] + self.blocks[b + 1]
+            self.blocks[b:b + 2] = [block]
+            self.maxes[b:b + 2] = [block[-1]]
+        if len(block) > 2 * CHAIN_LOAD:
+            half = len(block) // 2
+            self.blocks[b:b + 1] = [block[:half], block[half:]]
+            self.maxes[b:b + 1] = [block[half - 1], block[-1]]
+
+
+class IncrementalHull:
+    def __init__(self, points = ()):
+        # lower turns counterclockwise, upper turns clockwise; both run from the smallest to the largest point
+        self.lower = BlockedChain()
+        self.upper = BlockedChain()
+        self.extend(points)
+
+    def __len__(self):
+        return len(self.hull())
+
+    # Insert point into one chain: sign = 1 for the lower chain, -1 for the upper chain. Returns True if the chain changed
+    @staticmethod
+    def insertIntoChain(chain, point, sign):
+        previous, following = chain.around(point)
+        if following == point: return False
+        # Between two chain points: the point is inside (or on) this chain unless it lies strictly on the outer side
+        if previous is not None and following is not None and orient2d(previous, following, point) * sign >= 0: return False
+
+        left, right = chain.window(point, 2)
+        chain.add(point)
+        # Remove neighbours on the left that no longer make a strict turn
+        while len(left) == 2 and orient2d(left[0], left[1], point) * sign <= 0:
+            chain.remove(left[1])
+            left = chain.window(point, 2)[0]
+        # Remove neighbours on the right that no longer make a strict turn
+        while len(right) == 2 and orient2d(point, right[0], right[1]) * sign <= 0:
+            chain.remove(right[0])
+            right = chain.window(point, 3)[1][1:]
+        return True
+
+    # Add one (x, y) point: returns True if it changed the hull, False if it was rejected as inside or on the hull
+    def add(self, point):
+        point = tuple(point)
+        changed_lower = self.insertIntoChain(self.lower, point, 1)
+        changed_upper = self.insertIntoChain(self.upper, point, -1)
+        return changed_lower or changed_upper
+
+    # Add a batch of points: returns how many of them changed the hull
+    def extend(self, points):
+        return sum(1 for point in points if self.add(point))
+
+    # Returns True if point lies inside or on the current hull: O(log(h))
+    def contains(self, point):
+        point = tuple(point)
+        for chain, sign in ((self.lower, 1), (self.upper, -1)):
+            previous, following = chain.around(point)
+            # Past either end of the chain, or strictly on its outer side
+            if following is None or (following != point and (previous is None or orient2d(previous, following, point) * sign < 0)): return False
+        return True
+
+    # The current hull, counterclockwise from the lexicographically smallest point (same order as computeHull(points, cyclic = True))
+    def hull(self):
+        upper = list(self.upper)
+        return list(self.lower) + upper[-2:0:-1]
@@ -1,5 +1,7 @@
 import math
 import sys
+from bisect import bisect_left, bisect_right
+from predicates import orient2d
 
 EPSILON = sys.float_info.epsilon
 
@@ -39,27 +41,27 @@ def triangleArea(a, b, c):
 Given three points a,b,c,
 returns True if and only if 
 a,b,c represents a clockwise sequence
-(subject to floating-point precision)
+(exact: see predicates.orient2d)
 '''
 def cw(a, b, c):
-	return triangleArea(a,b,c) < EPSILON;
+	return orient2d(a, b, c) < 0
 '''
 Given three points a,b,c,
 returns True if and only if 
 a,b,c represents a counter-clockwise sequence
-(subject to floating-point precision)
+(exact: see predicates.orient2d)
 '''
 def ccw(a, b, c):
-	return triangleArea(a,b,c) > EPSILON;
+	return orient2d(a, b, c) > 0
 
 '''
 Given three points a,b,c,
 returns True if and only if 
 a,b,c are collinear
-(subject to floating-point precision)
+(exact: see predicates.orient2d)
 '''
 def collinear(a, b, c):
-	return abs(triangleArea(a,b,c)) <= EPSILON
+	return orient2d(a, b, c) == 0
 
 '''
 Given a list of points,
@@ -78,19 +80,89 @@ def clockwiseSort(points):
 Replace the implementation of computeHull with a correct computation of the convex hull
 using the divide-and-conquer algorithm
 '''
-# Find orientation of directed triangle formed by (a, b, c) by comparing slopes: O(1)
-# Note: collinear, cw and ccw helper functions above produce runtime errors for certain random inputs
+# Find orientation of directed triangle formed by (a, b, c): 1 --> clockwise, -1 --> counterclockwise, 0 --> collinear: O(1)
+# Uses the adaptive predicate, so float inputs near degeneracy are decided exactly instead of by comparing rounded slope products
 def findOrientation(a, b, c):
-    # Compute orientation terms derived from slopes of tangents from points a to b and b to c respectively
-    a_to_b_orientation = (b[1] - a[1]) * (c[0] - b[0]) 
-    b_to_c_orientation = (b[0] - a[0]) * (c[1] - b[1])
-    # If slope from a to b is equal to slope from b to c, it's collinear: greater --> triplet has clockwise orientation, lesser --> counterclockwise orientation
-    if ((a_to_b_orientation - b_to_c_orientation) == 0):  return 0  
-    elif (a_to_b_orientation > b_to_c_orientation): return 1
-    else: return -1
+    return -orient2d(a, b, c)
 
 
-def findTangents(left_hull, right_hull):
+# Returns True if point c lies on the ray from a through b strictly past b: used to step over collinear hull points
+def isBeyond(a, b, c):
+    return (b[0] - a[0]) * (c[0] - b[0]) + (b[1] - a[1]) * (c[1] - b[1]) > 0
+
+
+# Base case for cyclic mode: up to three x-sorted points returned counterclockwise starting from the lexicographically smallest point
+def cyclicBaseHull(points):
+    hull = list(points)
+    if len(hull) < 3: return hull
+    orientation = findOrientation(hull[0], hull[1], hull[2])
+    # Counterclockwise triangle is already in order, clockwise triangle swaps its last two points, collinear triplet drops its middle point
+    if orientation < 0: return hull
+    elif orientation > 0: return [hull[0], hull[2], hull[1]]
+    else: return [hull[0], hull[2]]
+
+
+# Tangent walks for cyclic mode over two counterclockwise hulls read in place: the left hull is left[left_start : left_start + n]
+# and the right hull is right[right_start : right_start + m] (the two may share one list), each starting at its lexicographically smallest point.
+# Returns (upper, lower) tangents as index pairs relative to each hull's start: O(n + m)
+# Each index only moves one way round its hull, so a walk takes fewer than n + m steps; one that does not is stopped with a ValueError
+def walkTangents(left, left_start, n, right, right_start, m):
+    # Rightmost point of the left hull ends its lower chain, leftmost point of the right hull is always index 0
+    rightmost = 0
+    for i in range(1, n):
+        if left[left_start + i] > left[left_start + rightmost]:
+            rightmost = i
+
+    # Lower tangent: walk the right hull counterclockwise and the left hull clockwise while the next point is below (or collinear past) the tangent line
+    left_index, right_index = rightmost, 0
+    for step in range(n + m):
+        p, q = left[left_start + left_index], right[right_start + right_index]
+        next_right = (right_index + 1) % m
+        r = right[right_start + next_right]
+        orientation = findOrientation(p, q, r)
+        if orientation > 0 or (orientation == 0 and isBeyond(p, q, r)):
+            right_index = next_right
+            continue
+        next_left = (left_index + n - 1) % n
+        r = left[left_start + next_left]
+        orientation = findOrientation(q, p, r)
+        if orientation < 0 or (orientation == 0 and isBeyond(q, p, r)):
+            left_index = next_left
+            continue
+        break
+    else:
+        raise ValueError("lower tangent walk did not finish in %d steps: the hulls are not x-separated counterclockwise hulls" % (n + m))
+    lower = (left_index, right_index)
+
+    # Upper tangent: walk the right hull clockwise and the left hull counterclockwise while the next point is above (or collinear past) the tangent line
+    left_index, right_index = rightmost, 0
+    for step in range(n + m):
+        p, q = left[left_start + left_index], right[right_start + right_index]
+        next_right = (right_index + m - 1) % m
+        r = right[right_start + next_right]
+        orientation = findOrientation(p, q, r)
+        if orientation < 0 or (orientation == 0 and isBeyond(p, q, r)):
+            right_index = next_right
+            continue
+        next_left = (left_index + 1) % n
+        r = left[left_start + next_left]
+        orientation = findOrientation(q, p, r)
+        if orientation > 0 or (orientation == 0 and isBeyond(q, p, r)):
+            left_index = next_left
+            continue
+        break
+    else:
+        raise ValueError("upper tangent walk did not finish in %d steps: the hulls are not x-separated counterclockwise hulls" % (n + m))
+    upper = (left_index, right_index)
+
+    return upper, lower
+
+
+def findTangents(left_hull, right_hull, cyclic = False):
+    # In cyclic mode both hulls are counterclockwise and start at their lexicographically smallest point, so we walk from known extremes: O(n)
+    if cyclic:
+        return walkTangents(left_hull, 0, len(left_hull), right_hull, 0, len(right_hull))
+
     # Find the indexes of the rightmost point of the left hull and the leftmost point of the right hull: O(n)
     left_index, right_index = 0, 0
     for i in range(len(left_hull)):
@@ -101,7 +173,9 @@ def findTangents(left_hull, right_hull):
             right_index = i
 
     # Iterate through each point in left_hull and right_hull to find the upper tangent: O(n)
-    while True:
+    # The walk is not monotone on degenerate input, so it gets a budget of twice round both hulls instead of looping forever
+    budget = 2 * (len(left_hull) + len(right_hull))
+    for step in range(budget):
         # If triangle (p_i, q_i, q_{i+1}) is oriented clockwise, the tangent from p_i to q_{i+1} will be above tangent connected to q_i: move right_index clockwise
         if findOrientation(left_hull[left_index], right_hull[right_index], right_hull[(right_index + 1) % len(right_hull)]) > 0:
             right_index = (right_index + 1) % len(right_hull) 
@@ -111,6 +185,8 @@ def findTangents(left_hull, right_hull):
         # Once we found maximally clockwise point for left_hull for forming a tangent with any point in right_hull above all points in left_hull, and maximal counterclockwise point in right_hull for same reason, break from loop
         else:
             break 
+    else:
+        raise ValueError("upper tangent walk did not finish in %d steps (use cyclic = True for degenerate input)" % budget)
     upper = (left_index, right_index)
 
     # Find the indexes of the leftmost point of the left hull and the rightmost point of the right hull: O(n)
@@ -123,7 +199,7 @@ def findTangents(left_hull, right_hull):
             right_index = i
 
     # Iterate through left_hull and right_hull to find lower tangent: O(n)
-    while True:
+    for step in range(budget):
         # If triangle (p_i, q_i, q_{i+1}) is oriented counterclockwise, the tangent formed from p_i to q_{i+1} is below tangent from p_i q_i: move right_index clockwise
         if findOrientation(left_hull[left_index], right_hull[right_index], right_hull[(right_index + 1) % len(right_hull)]) < 0: 
             right_index = (right_index + 1) % len(right_hull)
@@ -133,12 +209,34 @@ def findTangents(left_hull, right_hull):
         # We found p_i whose tangent with q_i is below all other points in left_hull and q_i whose tangent with p_i is below all other points in right_hull: break from loop
         else:
             break
+    else:
+        raise ValueError("lower tangent walk did not finish in %d steps (use cyclic = True for degenerate input)" % budget)
     lower = (left_index, right_index)
 
     return upper, lower
 
 
-def mergeHulls(left_hull, right_hull):
+def mergeHulls(left_hull, right_hull, cyclic = False):
+    # In cyclic mode the hulls are already in counterclockwise order from their leftmost point, so the merge is a linear splice: O(n)
+    if cyclic:
+        upper, lower = findTangents(left_hull, right_hull, cyclic)
+
+        # Left hull from its leftmost point counterclockwise to the lower tangent
+        merged_hull = left_hull[:lower[0] + 1]
+
+        # Right hull counterclockwise from the lower tangent to the upper tangent
+        j = lower[1]
+        merged_hull.append(right_hull[j])
+        while j != upper[1]:
+            j = (j + 1) % len(right_hull)
+            merged_hull.append(right_hull[j])
+
+        # Left hull counterclockwise from the upper tangent back around to its leftmost point (already added)
+        if upper[0] != 0:
+            merged_hull.extend(left_hull[max(upper[0], lower[0] + 1):])
+
+        return merged_hull
+
     # Sort points in left_hull and right_hull in counterclockwise order: O(n log (n)) 
     clockwiseSort(left_hull)
     clockwiseSort(right_hull)
@@ -166,14 +264,64 @@ def mergeHulls(left_hull, right_hull):
     return merged_hull
 
 
-def computeHull(points, initial = True):
+# Hull vertices plus every other point of ordered (the sorted, distinct input points) lying on the hull boundary, in the same
+# counterclockwise order starting from the lexicographically smallest point: O(n log(h))
+def addCollinearPoints(hull, ordered):
+    # A hull of two points means every point lies on the segment between them
+    if len(hull) <= 2: return list(ordered)
+    rightmost = hull.index(max(hull))
+    # Both chains sorted from the leftmost to the rightmost vertex, so each point's edge is found by binary search
+    lower_chain, upper_chain = hull[:rightmost + 1], [hull[0]] + hull[:rightmost - 1:-1]
+    lower_points, upper_points = [], []
+    for chain, boundary in ((lower_chain, lower_points), (upper_chain, upper_points)):
+        for point in ordered:
+            k = bisect_right(chain, point) - 1
+            if chain[k] == point or (k + 1 < len(chain) and orient2d(chain[k], chain[k + 1], point) == 0):
+                boundary.append(point)
+    # Both chains hold the two extreme vertices: keep them from the lower chain only
+    return lower_points + upper_points[-2:0:-1]
+
+
+# Points sorted by (x, y) with repeated points dropped, or with indices = True the indices of their first occurrences in that order: O(n log(n))
+# Every entry point sorts through here once: coincident points across a split would leave the tangent walks without a direction
+def sortedDistinct(points, indices = False):
+    if indices:
+        order = sorted(range(len(points)), key=points.__getitem__)
+        return [order[i] for i in range(len(order)) if i == 0 or points[order[i]] != points[order[i - 1]]]
+    ordered = sorted(points, key=lambda x: (x[0], x[1]))
+    return [ordered[i] for i in range(len(ordered)) if i == 0 or ordered[i] != ordered[i - 1]]
+
+
+# prefilter = True drops points strictly inside the Akl-Toussaint octagon before sorting (needs numpy); the number dropped goes to stats['prefilter_discarded']
+# collinear = True (cyclic mode) also keeps the points lying on hull edges, between the vertices they separate
+def computeHull(points, initial = True, cyclic = False, prefilter = False, stats = None, collinear = False):
+    if prefilter and initial == True:
+        from array_convexhull import prefilterPoints
+        points, discarded = prefilterPoints(points)
+        if stats is not None: stats['prefilter_discarded'] = discarded
+
+    if collinear and initial == True:
+        ordered = sortedDistinct(points)
+        return addCollinearPoints(computeHull(ordered, False, True), ordered)
+
+    # In cyclic mode every hull we return is counterclockwise from its lexicographically smallest point, so mergeHulls never re-sorts
+    if cyclic:
+        # Sort once and drop repeated points
+        if initial == True: points = sortedDistinct(points)
+        if len(points) <= 3: return cyclicBaseHull(points) if points else []
+        mid = len(points) // 2
+        left_hull = computeHull(points[:mid], False, cyclic)
+        right_hull = computeHull(points[mid:], False, cyclic)
+        return mergeHulls(left_hull, right_hull, cyclic)
+
     # If we have three points or less, we have a triangle, line or single point which is its own convex hull
     if len(points) <= 3: return points  
 
     # Sort the points by x-coordinate before making a recursive call, set initial = False so we don't sort by x-coordinates again
     if initial == True:
-        points = sorted(points, key=lambda x: (x[0], x[1])) 
+        points = sortedDistinct(points)
         initial = False
+        if len(points) <= 3: return points
 
     # Recursively find the convex hulls of the left and right point sets
     mid = len(points) // 2
@@ -185,8 +333,107 @@ def computeHull(points, initial = True):
 
     return convex_hull
 
+# Base case of the slice-free recursion: the up to three sorted points in hulls[lo:hi] are put in cyclic order in place. Returns the hull size
+def baseRange(hulls, lo, hi):
+    if hi - lo == 3:
+        orientation = findOrientation(hulls[lo], hulls[lo + 1], hulls[lo + 2])
+        if orientation > 0: hulls[lo + 1], hulls[lo + 2] = hulls[lo + 2], hulls[lo + 1]
+        elif orientation == 0:
+            hulls[lo + 1] = hulls[lo + 2]
+            return 2
+    return hi - lo
+
+
+# Merge step of the slice-free recursion: the left hull source[lo:lo + n] and the right hull source[mid:mid + m] (mid >= lo + n)
+# are merged into target[lo:], point by point, so nothing is staged or sliced. Returns the size of the merged hull
+def mergeRanges(source, target, lo, n, mid, m):
+    upper, lower = walkTangents(source, lo, n, source, mid, m)
+
+    # Left hull from its leftmost point to the lower tangent
+    k = lo
+    for i in range(lower[0] + 1):
+        target[k] = source[lo + i]
+        k += 1
+    # Right hull from the lower to the upper tangent, then the left hull from the upper tangent round to its end
+    j = lower[1]
+    target[k] = source[mid + j]
+    k += 1
+    while j != upper[1]:
+        j = (j + 1) % m
+        target[k] = source[mid + j]
+        k += 1
+    if upper[0] != 0:
+        for i in range(max(upper[0], lower[0] + 1), n):
+            target[k] = source[lo + i]
+            k += 1
+    return k - lo
+
+
+# Slice-free recursion for cyclic mode: hulls and scratch both start out holding the sorted points, and the hull of the range lo:hi is written
+# over the prefix of hulls[lo:hi]. The two halves are hulled into scratch (with the buffers' roles swapped) and merged from there, so the
+# buffers alternate between levels and no level allocates sub-lists or copies a merged hull back. Returns the size of the hull written at hulls[lo]
+def hullRange(hulls, scratch, lo, hi):
+    if hi - lo <= 3: return baseRange(hulls, lo, hi)
+    mid = (lo + hi) // 2
+    n = hullRange(scratch, hulls, lo, mid)
+    m = hullRange(scratch, hulls, mid, hi)
+    return mergeRanges(scratch, hulls, lo, n, mid, m)
+
+
+# Cyclic-mode hull that sorts once and recurses over (lo, hi) ranges of two shared buffers instead of slicing
+# Returns the indices into points of the hull vertices, counterclockwise from the lexicographically smallest point
+def computeHullIndices(points):
+    order = sortedDistinct(points, indices = True)
+    ordered = [points[i] for i in order]
+    hulls, scratch = list(ordered), list(ordered)
+    h = hullRange(hulls, scratch, 0, len(hulls)) if hulls else 0
+    # Hull points are distinct and ordered is sorted, so each maps back to its input index by binary search
+    return [order[bisect_left(ordered, hulls[i])] for i in range(h)]
+
+
+# Default block size for computeHullBottomUp: monotone-chain base hulls over 64 sorted points replace the five lowest merge levels
+BOTTOM_UP_BLOCK = 64
+
+
+# Iterative cyclic-mode hull: sorts once, builds base hulls over consecutive blocks of block_size sorted points, then merges
+# neighbouring hulls pairwise level by level in a loop, so no recursion is involved. Like hullRange it works in two shared
+# buffers (each block's hull is written over the block's prefix, in the buffer of its level), so a level only tracks block starts and hull sizes.
+# Blocks of up to three points use baseRange, larger blocks the monotone chain. Returns the same hull as computeHull(points, cyclic = True)
+def computeHullBottomUp(points, block_size = BOTTOM_UP_BLOCK):
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1, got %r" % (block_size,))
+    hulls = sortedDistinct(points)
+    if not hulls: return []
+    starts = list(range(0, len(hulls), block_size))
+    if block_size <= 3:
+        sizes = [baseRange(hulls, lo, min(lo + block_size, len(hulls))) for lo in starts]
+    else:
+        from hull_engines import monotoneChain
+        sizes = []
+        for lo in starts:
+            block = monotoneChain(hulls[lo:lo + block_size])
+            hulls[lo:lo + len(block)] = block
+            sizes.append(len(block))
+
+    # Each level merges from hulls into scratch, then the two buffers swap roles
+    scratch = [None] * len(hulls)
+    while len(starts) > 1:
+        merged_starts, merged_sizes = starts[0::2], []
+        for k in range(0, len(starts) - 1, 2):
+            merged_sizes.append(mergeRanges(hulls, scratch, starts[k], sizes[k], starts[k + 1], sizes[k + 1]))
+        # An odd hull out is carried up to the next level unchanged, copied across so it is in the same buffer as the rest
+        if len(starts) % 2 == 1:
+            for i in range(starts[-1], starts[-1] + sizes[-1]):
+                scratch[i] = hulls[i]
+            merged_sizes.append(sizes[-1])
+        starts, sizes = merged_starts, merged_sizes
+        hulls, scratch = scratch, hulls
+    return hulls[:sizes[0]]
+
 # At each level, we make two recursive calls by passing in half of our points.
 # Although finding the tangent lines is linear (only have to iterate through left_hull and right_hull), because we have to sort our hulls clockwise, our merge and combine steps are O(n log(n)).
 # This gives us a Recurrence Relation of T(n) = { O(1) when n <= 3 , 2T(n/2) + O(n log(n)) otherwise
 # We cannot solve this using Master's Theorem! Recurrence analysis will give us T(n) = O(n log^2 (n)).
-# Our running time when compared to Merge Sort reflects this: although computeHull doesn't run substantially faster, with larger lists our difference begins to widen and even double. 
\ No newline at end of file
+# Our running time when compared to Merge Sort reflects this: although computeHull doesn't run substantially faster, with larger lists our difference begins to widen and even double. 
+# With cyclic = True, base hulls come out counterclockwise from their leftmost point and findTangents / mergeHulls splice them without leaving that order.
+# The merge step is then linear, giving T(n) = 2T(n/2) + O(n) = O(n log(n)) with the single initial sort as the only sorting work.
@@ -0,0 +1,72 @@
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from array_convexhull import sortedUnique
+from hull_tangents import merge
+from new_convexhull import computeHull
+
+'''
+Parallel divide and conquer: the points are sorted and de-duplicated once, copied
+into a shared-memory buffer, and split into k consecutive x-slabs. Each worker
+process attaches to the buffer and runs computeHull (cyclic mode) on its slab,
+and the slab hulls are then combined pairwise with hull_tangents.merge in a reduction tree.
+'''
+
+# Below this many points per process, pool start-up costs more than it saves
+MIN_POINTS_PER_PROCESS = 50000
+
+# Per-worker view of the shared sorted point buffer, set by attachBuffer
+sharedMemory = None
+sharedPoints = None
+
+
+# Pool initializer: attach this worker to the shared buffer of sorted points
+def attachBuffer(name, shape, dtype):
+    global sharedMemory, sharedPoints
+    sharedMemory = shared_memory.SharedMemory(name=name)
+    sharedPoints = np.ndarray(shape, dtype=dtype, buffer=sharedMemory.buf)
+
+
+# Worker task: hull of the sorted, de-duplicated slab sharedPoints[lo:hi] in cyclic order
+def slabHull(bounds):
+    lo, hi = bounds
+    slab = sharedPoints[lo:hi].tolist()
+    return computeHull([tuple(p) for p in slab], initial = False, cyclic = True)
+
+
+# Merge neighbouring hulls pairwise, level by level, until one hull is left: O(h log(k)) for k slabs, all of it list slicing
+def reduceHulls(hulls):
+    while len(hulls) > 1:
+        merged = [merge(hulls[i], hulls[i + 1]) for i in range(0, len(hulls) - 1, 2)]
+        if len(hulls) % 2 == 1: merged.append(hulls[-1])
+        hulls = merged
+    return hulls[0] if hulls else []
+
+
+# Convex hull of a list of points or an (N, 2) array, split into k slabs hulled by a pool of processes
+# Returns the hull as a list of (x, y) tuples, counterclockwise from the lexicographically smallest point
+def parallelHull(points, k = None, processes = None):
+    points = np.asarray(points)
+    if len(points) == 0: return []
+    processes = processes or os.cpu_count() or 1
+    k = k or processes
+    if not np.issubdtype(points.dtype, np.integer): points = points.astype(np.float64)
+    ordered = points[sortedUnique(points[:, 0], points[:, 1])]
+
+    # Every slab gets at least MIN_POINTS_PER_PROCESS points; if that leaves one slab (or there is one process), run the serial cyclic recursion
+    k = min(k, len(ordered) // MIN_POINTS_PER_PROCESS)
+    if processes == 1 or k <= 1:
+        return computeHull([tuple(p) for p in ordered.tolist()], initial = False, cyclic = True)
+
+    bounds = [(len(ordered) * i // k, len(ordered) * (i + 1) // k) for i in range(k)]
+    buffer = shared_memory.SharedMemory(create = True, size = ordered.nbytes)
+    try:
+        np.ndarray(ordered.shape, dtype = ordered.dtype, buffer = buffer.buf)[:] = ordered
+        with Pool(min(processes, k), initializer = attachBuffer, initargs = (buffer.name, ordered.shape, ordered.dtype)) as pool:
+            hulls = pool.map(slabHull, bounds)
+    finally:
+        buffer.close()
+        buffer.unlink()
+    return reduceHulls(hulls)
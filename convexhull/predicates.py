@@ -0,0 +1,94 @@
+import sys
+from fractions import Fraction
+from numbers import Integral
+
+'''
+Adaptive orientation predicates shared by the hull engines (orient3d for hull3d).
+Integer coordinates are exact already (Python ints never round; a determinant of
+numpy integers, whose int64 products can wrap around, is redone in Python ints),
+so only float inputs need care: the floating-point determinant is trusted whenever it clears
+Shewchuk's forward error bound, and the few near-degenerate triplets that do not
+are recomputed exactly with rationals.
+'''
+
+# Unit roundoff of IEEE doubles (half the gap between 1.0 and the next float)
+UNIT_ROUNDOFF = sys.float_info.epsilon / 2
+# Relative error bound of the floating-point orientation determinant (Shewchuk's ccwerrboundA)
+ORIENT_ERROR_BOUND = (3.0 + 16.0 * UNIT_ROUNDOFF) * UNIT_ROUNDOFF
+# Relative error bound of the floating-point 3D orientation determinant (Shewchuk's o3derrboundA)
+ORIENT3D_ERROR_BOUND = (7.0 + 56.0 * UNIT_ROUNDOFF) * UNIT_ROUNDOFF
+
+
+# Determinant types that come from numpy scalar coordinates (numpy.float64 subclasses float, so it is listed separately)
+NUMPY_SCALARS = (Integral, float)
+
+
+# Point with numpy scalars turned into Python numbers: integers into ints, so their products cannot overflow, and floats into floats
+def plainPoint(point):
+    return tuple(int(value) if isinstance(value, Integral) else float(value) if isinstance(value, float) else value for value in point)
+
+
+# Coordinate as an exact Python number: numpy integers become ints (Fraction would keep them, and their overflowing arithmetic), the rest Fractions
+def exactValue(value):
+    return int(value) if isinstance(value, Integral) else Fraction(value)
+
+
+# Exact sign of the cross product (b - a) x (c - a) using rational arithmetic: slow, only used near degeneracy or for numpy integers
+def exactOrientation(a, b, c):
+    ax, ay = exactValue(a[0]), exactValue(a[1])
+    det = (exactValue(b[0]) - ax) * (exactValue(c[1]) - ay) - (exactValue(b[1]) - ay) * (exactValue(c[0]) - ax)
+    return int(det > 0) - int(det < 0)
+
+
+# Sign of the cross product (b - a) x (c - a): 1 if a, b, c turn counterclockwise, -1 if clockwise, 0 if collinear
+def orient2d(a, b, c):
+    left = (b[0] - a[0]) * (c[1] - a[1])
+    right = (b[1] - a[1]) * (c[0] - a[0])
+    det = left - right
+    # All-integer input: the determinant is already exact
+    if type(det) is int: return (det > 0) - (det < 0)
+    # numpy scalars: redo it with Python numbers, as int64 products may have wrapped around
+    if type(det) is not float and isinstance(det, NUMPY_SCALARS): return orient2d(plainPoint(a), plainPoint(b), plainPoint(c))
+    # Fast path: the rounding error cannot have flipped the sign
+    if abs(det) > ORIENT_ERROR_BOUND * (abs(left) + abs(right)):
+        return 1 if det > 0 else -1
+    return exactOrientation(a, b, c)
+
+
+# Sign of the cross product (b - a) x (d - c) of two edge vectors: 1 if edge c -> d turns counterclockwise from edge a -> b,
+# -1 if clockwise, 0 if they are parallel. Two differences per product as in orient2d, so the same error bound holds
+def crossSign(a, b, c, d):
+    left = (b[0] - a[0]) * (d[1] - c[1])
+    right = (b[1] - a[1]) * (d[0] - c[0])
+    det = left - right
+    if type(det) is int: return (det > 0) - (det < 0)
+    if type(det) is not float and isinstance(det, NUMPY_SCALARS): return crossSign(plainPoint(a), plainPoint(b), plainPoint(c), plainPoint(d))
+    if abs(det) > ORIENT_ERROR_BOUND * (abs(left) + abs(right)):
+        return 1 if det > 0 else -1
+    det = (exactValue(b[0]) - exactValue(a[0])) * (exactValue(d[1]) - exactValue(c[1])) - (exactValue(b[1]) - exactValue(a[1])) * (exactValue(d[0]) - exactValue(c[0]))
+    return int(det > 0) - int(det < 0)
+
+
+# Exact sign of (d - a) . ((b - a) x (c - a)) using rational arithmetic: slow, only used near degeneracy
+def exactOrientation3d(a, b, c, d):
+    ax, ay, az = exactValue(a[0]), exactValue(a[1]), exactValue(a[2])
+    ux, uy, uz = exactValue(b[0]) - ax, exactValue(b[1]) - ay, exactValue(b[2]) - az
+    vx, vy, vz = exactValue(c[0]) - ax, exactValue(c[1]) - ay, exactValue(c[2]) - az
+    wx, wy, wz = exactValue(d[0]) - ax, exactValue(d[1]) - ay, exactValue(d[2]) - az
+    det = wx * (uy * vz - uz * vy) + wy * (uz * vx - ux * vz) + wz * (ux * vy - uy * vx)
+    return int(det > 0) - int(det < 0)
+
+
+# Sign of (d - a) . ((b - a) x (c - a)): 1 if d is on the side a, b, c turn counterclockwise around (seen from d), -1 on the other side, 0 if coplanar
+def orient3d(a, b, c, d):
+    ux, uy, uz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    vx, vy, vz = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+    wx, wy, wz = d[0] - a[0], d[1] - a[1], d[2] - a[2]
+    det = wx * (uy * vz - uz * vy) + wy * (uz * vx - ux * vz) + wz * (ux * vy - uy * vx)
+    # All-integer input: the determinant is already exact
+    if type(det) is int: return (det > 0) - (det < 0)
+    if type(det) is not float and isinstance(det, NUMPY_SCALARS): return orient3d(plainPoint(a), plainPoint(b), plainPoint(c), plainPoint(d))
+    permanent = abs(wx) * (abs(uy * vz) + abs(uz * vy)) + abs(wy) * (abs(uz * vx) + abs(ux * vz)) + abs(wz) * (abs(ux * vy) + abs(uy * vx))
+    if abs(det) > ORIENT3D_ERROR_BOUND * permanent:
+        return 1 if det > 0 else -1
+    return exactOrientation3d(a, b, c, d)
@@ -0,0 +1,82 @@
+import numpy as np
+
+from array_convexhull import coordinateColumns, orientationDeterminants, orientationSigns, sortedHull, sortedUnique
+
+'''
+Quickhull over an (N, 2) array of points. Starting from the segments between the
+lexicographically smallest and largest points, every round takes each hull segment
+that still has points outside it, finds the farthest of them (a hull vertex), splits
+the segment there and re-partitions the remaining points into the two new outside
+sets. All segments of a round are handled together with whole-array operations, so
+a round costs a few passes over the surviving points and no per-point Python call.
+On most inputs the first rounds discard nearly all points as interior, so the only
+sort is over the few vertex candidates that are left.
+
+computeHull returns the indices of the hull vertices in the same canonical order as
+array_convexhull.computeHull; quickHull takes and returns lists of (x, y) points.
+'''
+
+# Index of the lexicographically smallest (or largest) point: O(n), no sort
+def extremeIndex(x, y, largest = False):
+    pick = np.argmax if largest else np.argmin
+    ties = np.flatnonzero(x == x[pick(x)])
+    return ties[pick(y[ties])]
+
+
+# Indices of every hull vertex, possibly with repeats and points on hull edges
+# Segment k runs from start[k] to end[k] counterclockwise along the hull, so the points outside it are those strictly to its right.
+# The points still outside some segment are kept grouped by segment, and a point is only discarded once it is exactly (orientationSigns)
+# on or inside both halves of its split segment: a triangle of points in the hull, which holds no vertex but its corners.
+# The farthest point is only picked from float determinants, so a rounding slip can add an extra candidate but never lose a vertex
+def quickhullCandidates(x, y):
+    left, right = extremeIndex(x, y), extremeIndex(x, y, True)
+    candidates = [np.array([left, right])]
+    start, end = np.array([left, right]), np.array([right, left])
+    # Every point starts out in both the lower (0) and upper (1) segment: the first round drops it from the side it is not outside of
+    points = np.tile(np.arange(len(x)), 2)
+    segment = np.repeat(np.arange(2), len(x))
+    while len(points):
+        det, signs = orientationDeterminants(x, y, start[segment], end[segment], points)
+        outside = signs < 0
+        points, segment, det = points[outside], segment[outside], det[outside]
+        if len(points) == 0: break
+
+        # Each segment with outside points is a run of the arrays: its apex is the first point with the most negative determinant
+        first = np.flatnonzero(np.r_[True, segment[1:] != segment[:-1]])
+        run = np.repeat(np.arange(len(first)), np.diff(np.r_[first, len(points)]))
+        at = np.flatnonzero(det == np.minimum.reduceat(det, first)[run])
+        at = at[np.r_[True, run[at][1:] != run[at][:-1]]]
+        apex = points[at]
+        candidates.append(apex)
+
+        # Segment s splits into (start, apex) and (apex, end): points outside the first half go there, the rest are tried against the second
+        # The apexes leave the arrays first, since testing a point against a segment ending at it only costs an exact fallback
+        split = segment[first]
+        rest = np.ones(len(points), dtype=bool)
+        rest[at] = False
+        points, segment, run = points[rest], segment[rest], run[rest]
+        before = orientationSigns(x, y, start[segment], apex[run], points) < 0
+        start = np.column_stack((start[split], apex)).ravel()
+        end = np.column_stack((apex, end[split])).ravel()
+        segment = 2 * run + ~before
+        order = np.argsort(segment, kind='stable')
+        points, segment = points[order], segment[order]
+    return np.concatenate(candidates)
+
+
+# Compute the convex hull of an (N, 2) array, returning hull vertex indices counterclockwise from the lexicographically smallest point
+# The candidates quickhullCandidates leaves are put in canonical order (and any non-vertex among them dropped) by array_convexhull's chains
+def computeHull(points):
+    points = np.asarray(points)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("points must be an (N, 2) array, got shape %s" % (points.shape,))
+    x, y = coordinateColumns(points)
+    if len(x) == 0: return np.zeros(0, dtype=np.int64)
+
+    candidates = quickhullCandidates(x, y)
+    return sortedHull(x, y, candidates[sortedUnique(x[candidates], y[candidates])])
+
+
+# Quickhull for a list of (x, y) points: returns the hull as a list of points in canonical order
+def quickHull(points):
+    return [points[i] for i in computeHull(points).tolist()] if len(points) else []
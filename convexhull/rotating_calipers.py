@@ -0,0 +1,177 @@
+import math
+
+import numpy as np
+
+'''
+Rotating calipers over a convex hull: diameter (farthest pair), width and the
+minimum-area oriented bounding box, each in O(h) for a hull of h vertices.
+The hull is a list of (x, y) vertices in the order the engines return them
+(counterclockwise from the lexicographically smallest point); a clockwise hull is
+reversed first. Each caliper is a pointer that only moves forward while the
+edges are visited in order, so one turn around the hull visits every antipodal pair.
+
+batchCalipers computes all three for many hulls at once from the CSR-style output
+of array_convexhull.batchHulls.
+'''
+
+# Cross product (b - a) x (c - a): twice the signed area of the triangle a, b, c
+def cross(a, b, c):
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+
+# Dot product (b - a) . (c - a)
+def dot(a, b, c):
+    return (b[0] - a[0]) * (c[0] - a[0]) + (b[1] - a[1]) * (c[1] - a[1])
+
+
+# The hull's vertices in counterclockwise order: O(h)
+def counterclockwise(hull):
+    hull = [tuple(vertex) for vertex in hull]
+    area = sum(hull[i - 1][0] * hull[i][1] - hull[i][0] * hull[i - 1][1] for i in range(len(hull)))
+    return hull[::-1] if area < 0 else hull
+
+
+# For every edge (hull[i], hull[i + 1]), the index of a vertex farthest from its line: O(h)
+def antipodes(hull):
+    h = len(hull)
+    j = 1 % h
+    farthest = []
+    for i in range(h):
+        a, b = hull[i], hull[(i + 1) % h]
+        while cross(a, b, hull[(j + 1) % h]) > cross(a, b, hull[j]):
+            j = (j + 1) % h
+        farthest.append(j)
+    return farthest
+
+
+# Farthest pair of hull vertices: returns (distance, (p, q))
+def diameter(hull):
+    hull = counterclockwise(hull)
+    h = len(hull)
+    if h == 0:
+        raise ValueError("the diameter of an empty hull is undefined")
+    best, pair = 0, (hull[0], hull[0])
+    for i, j in enumerate(antipodes(hull)):
+        # Every antipodal pair has a vertex at one end of an edge and the other farthest from that edge;
+        # when the opposite side is parallel, the vertex after j is equally far
+        for p in (hull[i], hull[(i + 1) % h]):
+            for q in (hull[j], hull[(j + 1) % h]):
+                distance = dot(p, q, q)
+                if distance > best: best, pair = distance, (p, q)
+    return math.sqrt(best), pair
+
+
+# Minimum distance between two parallel lines enclosing the hull: returns (width, (p, q, r)) where one line
+# runs along the hull edge p -> q and the other passes through vertex r
+def width(hull):
+    hull = counterclockwise(hull)
+    h = len(hull)
+    if h == 0:
+        raise ValueError("the width of an empty hull is undefined")
+    if h <= 2: return 0.0, (hull[0], hull[-1], hull[0])
+    best, support = None, None
+    for i, j in enumerate(antipodes(hull)):
+        a, b = hull[i], hull[(i + 1) % h]
+        height = cross(a, b, hull[j]) / math.sqrt(dot(a, b, b))
+        if best is None or height < best: best, support = height, (a, b, hull[j])
+    return best, support
+
+
+# Minimum-area rectangle enclosing the hull: returns (area, corners), the four corners counterclockwise
+# One side of the optimal rectangle lies along a hull edge (Freeman and Shapira), so each edge is tried with
+# three calipers: the farthest vertex from the edge and the extreme vertices forwards and backwards along it
+def minimumBoundingBox(hull):
+    hull = counterclockwise(hull)
+    h = len(hull)
+    if h == 0:
+        raise ValueError("the bounding box of an empty hull is undefined")
+    if h == 1: return 0.0, [hull[0]] * 4
+    forward, backward = 1, 0
+    best, corners = None, None
+    for i, j in enumerate(antipodes(hull)):
+        a, b = hull[i], hull[(i + 1) % h]
+        while dot(a, b, hull[(forward + 1) % h]) > dot(a, b, hull[forward]):
+            forward = (forward + 1) % h
+        # The backward caliper starts at the antipodal vertex the first time round, past the forward extreme
+        if i == 0: backward = j
+        while dot(a, b, hull[(backward + 1) % h]) < dot(a, b, hull[backward]):
+            backward = (backward + 1) % h
+        length = dot(a, b, b)
+        height = cross(a, b, hull[j]) / length
+        lo, hi = dot(a, b, hull[backward]) / length, dot(a, b, hull[forward]) / length
+        area = (hi - lo) * height * length
+        if best is None or area < best:
+            ux, uy = b[0] - a[0], b[1] - a[1]
+            best = area
+            corners = [(a[0] + lo * ux, a[1] + lo * uy), (a[0] + hi * ux, a[1] + hi * uy),
+                       (a[0] + hi * ux - height * uy, a[1] + hi * uy + height * ux),
+                       (a[0] + lo * ux - height * uy, a[1] + lo * uy + height * ux)]
+    return best, corners
+
+
+# Diameter, width and minimum-area bounding box of every hull in CSR-style (offsets, indices) into an (N, 2) points array,
+# as returned by array_convexhull.batchHulls (each hull counterclockwise). Returns (diameters, widths, box_areas, boxes),
+# the boxes as a (G, 4, 2) array of counterclockwise corners; empty hulls get NaN
+# Instead of walking pointers, each caliper is found by binary search over the hulls' edge angles, measured from
+# their first edge: all hulls are searched at once by offsetting hull g's angles by 8g (more than 2 pi)
+def batchCalipers(points, offsets, indices):
+    offsets = np.asarray(offsets)
+    vertices = np.asarray(points, dtype=np.float64)[np.asarray(indices)]
+    groups = len(offsets) - 1
+    sizes = np.diff(offsets)
+    diameters, widths, box_areas = np.full(groups, np.nan), np.full(groups, np.nan), np.full(groups, np.nan)
+    boxes = np.full((groups, 4, 2), np.nan)
+    nonempty = np.flatnonzero(sizes)
+    if len(vertices) == 0: return diameters, widths, box_areas, boxes
+
+    group = np.repeat(np.arange(groups), sizes)
+    start, size = offsets[group], sizes[group]
+    position = np.arange(len(vertices)) - start
+    successor = start + (position + 1) % size
+    edges = vertices[successor] - vertices
+    angles = np.arctan2(edges[:, 1], edges[:, 0])
+    angles = (angles - angles[start]) % (2 * np.pi)
+    # Rounding could leave an angle a hair below its predecessor: the search needs them non-decreasing
+    keys = np.maximum.accumulate(group * 8.0 + angles)
+
+    # Vertex extreme in the direction at the given angle counterclockwise of each edge: its normal cone holds that direction
+    def extreme(turn):
+        target = group * 8.0 + (angles + turn + np.pi / 2) % (2 * np.pi)
+        found = np.searchsorted(keys, target) - start
+        return start + np.where(found >= size, 0, found)
+
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        units = edges / lengths[:, None]
+    normals = np.column_stack((-units[:, 1], units[:, 0]))
+    far = extreme(np.pi / 2)
+    heights = np.einsum('ij,ij->i', normals, vertices[far] - vertices)
+    ahead = np.einsum('ij,ij->i', units, vertices[extreme(0)] - vertices)
+    behind = np.einsum('ij,ij->i', units, vertices[extreme(np.pi)] - vertices)
+    areas = (ahead - behind) * heights
+
+    # Candidate farthest pairs: both ends of each edge against its antipodal vertex and that vertex's neighbours
+    distances = np.zeros(len(vertices))
+    for shift in (-1, 0, 1):
+        opposite = start + (far - start + shift) % size
+        for end in (np.arange(len(vertices)), successor):
+            distances = np.maximum(distances, np.hypot(*(vertices[opposite] - vertices[end]).T))
+
+    # A single-point hull has no edge direction: everything is zero and the box collapses onto the point
+    single = size == 1
+    heights[single], areas[single] = 0.0, 0.0
+    ahead[single], behind[single] = 0.0, 0.0
+    units[single], normals[single] = 0.0, 0.0
+
+    starts = offsets[nonempty]
+    diameters[nonempty] = np.maximum.reduceat(distances, starts)
+    widths[nonempty] = np.minimum.reduceat(heights, starts)
+    box_areas[nonempty] = np.minimum.reduceat(areas, starts)
+    # The first edge of each hull reaching its minimum area defines the box
+    best = np.flatnonzero(areas == box_areas[group])
+    best = best[np.unique(group[best], return_index=True)[1]]
+    base, unit, normal = vertices[best], units[best], normals[best]
+    lo, hi, height = behind[best][:, None], ahead[best][:, None], heights[best][:, None]
+    boxes[group[best]] = np.stack((base + lo * unit, base + hi * unit,
+                                   base + hi * unit + height * normal, base + lo * unit + height * normal), axis=1)
+    return diameters, widths, box_areas, boxes
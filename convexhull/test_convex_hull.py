@@ -1,30 +1,40 @@
-import unittest, random
+import unittest, random, math
 import new_convexhull as convexhull
+import array_convexhull
+import predicates
+import parallel_convexhull
+import incremental_convexhull
+from incremental_convexhull import IncrementalHull
+import dynamic_convexhull
+import file_convexhull
+import tempfile, os
+import benchmark_convexhull
+import hull_engines
+from hull_cache import HullCache
+from hull_index import HullIndex
+import rotating_calipers
+import hull_tangents
+import quickhull
+import hull3d
+from convex_layers import convexLayers
+import convex_polygons
+import best_convexhull_code_yet
+from hull_trace import HullTrace
+import io
+from contextlib import redirect_stdout
+import numpy as np
 import matplotlib.pyplot as plt
-import time
 
-# We use mergesort to benchmark running time (How does computeHull's running time compare to a logarithmic algorithm?)
-def mergesort(L):
-    if len(L) <= 1: return L 
-
-    median = len(L) // 2
-    left = L[:median]  
-    right = L[median:] 
-
-    left = mergesort(left)
-    right = mergesort(right)
-
-    i, j = 0, 0
-    while i < len(left) and j < len(right):
-        if left[i] < right[j]:
-            L[i+j] = left[i]
-            i += 1 
-        else:
-            L[i + j] = right[j]
-            j += 1
-
-    L[i+j:] = left[i:] + right[j:] 
-    return L    
+# Checks that hull is strictly convex, counterclockwise from the lexicographically smallest point, and contains every point: O(nh)
+def isCyclicHull(points, hull):
+    cross = lambda a, b, c: (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+    if sorted(set(hull)) != sorted(hull) or hull[0] != min(points): return False
+    if len(hull) < 3: return all(cross(hull[0], hull[-1], p) == 0 for p in points)
+    for i in range(len(hull)):
+        a, b = hull[i], hull[(i + 1) % len(hull)]
+        if cross(a, b, hull[(i + 2) % len(hull)]) <= 0: return False
+        if any(cross(a, b, p) < 0 for p in points): return False
+    return True
 
 
 class TestConvexHull(unittest.TestCase):
@@ -147,32 +157,512 @@ class TestConvexHull(unittest.TestCase):
         plt.show()
 
 
+    def test_cyclic_mode_random_points(self):
+        # Cyclic mode keeps every sub-hull counterclockwise, so the result should be a valid hull in canonical order (including grids with duplicates and collinear runs)
+        for n in [1, 2, 3, 4, 10, 100, 1000]:
+            for grid in [5, 100, 10000]:
+                points = [(random.randrange(0, grid, 1), random.randrange(0, grid, 1)) for i in range(n)]
+                self.assertTrue(isCyclicHull(points, convexhull.computeHull(points, cyclic = True)))
+        line = [(x, 2 * x + 1) for x in range(20)] * 2
+        self.assertEqual(convexhull.computeHull(line, cyclic = True), [(0, 1), (19, 39)])
+
+
+    def test_slice_free_indices_match_cyclic_mode(self):
+        # computeHullIndices recurses over index ranges of two alternating buffers: its indices should pick out the cyclic-mode hull
+        for n in [0, 1, 3, 4, 5, 7, 50, 1000]:
+            for grid in [4, 10000]:
+                points = [(random.randrange(0, grid, 1), random.randrange(0, grid, 1)) for i in range(n)]
+                indices = convexhull.computeHullIndices(points)
+                self.assertEqual([points[i] for i in indices], convexhull.computeHull(points, cyclic = True))
+
+
+    def test_array_hull_matches_cyclic_mode(self):
+        # The array engine returns indices, which should pick out the same canonical hull as cyclic mode
+        for n in [1, 2, 5, 100, 1000]:
+            for grid in [5, 10000]:
+                points = [(random.randrange(0, grid, 1), random.randrange(0, grid, 1)) for i in range(n)]
+                indices = array_convexhull.computeHull(np.array(points))
+                self.assertEqual([points[i] for i in indices], convexhull.computeHull(points, cyclic = True))
+        points = np.random.rand(1000, 2)
+        hull = [tuple(points[i]) for i in array_convexhull.computeHull(points)]
+        self.assertTrue(isCyclicHull([tuple(p) for p in points], hull))
+        # Coordinates around 3e9 have determinants beyond int64: every array engine must still agree with the exact list engine
+        for n in [3, 50, 500]:
+            points = [(random.randrange(-3 * 10 ** 9, 3 * 10 ** 9), random.randrange(-3 * 10 ** 9, 3 * 10 ** 9)) for i in range(n)]
+            array = np.array(points)
+            expected = convexhull.computeHull(points, cyclic = True)
+            for indices in [array_convexhull.computeHull(array), array_convexhull.computeHull(array, prefilter = True),
+                            array_convexhull.batchHulls(array, np.zeros(n, dtype=int))[1], quickhull.computeHull(array)]:
+                self.assertEqual([points[i] for i in indices], expected)
+            queries = [(random.randrange(-3 * 10 ** 9, 3 * 10 ** 9), random.randrange(-3 * 10 ** 9, 3 * 10 ** 9)) for i in range(200)]
+            index = HullIndex(expected)
+            self.assertEqual(index.contains(np.array(queries)).tolist(), [query in index for query in queries])
+        with self.assertRaises(ValueError): array_convexhull.computeHull(np.array([(2 ** 62, 0), (0, 1), (1, 0)]))
+
+
+    def test_prefilter_keeps_hull(self):
+        # The Akl-Toussaint prefilter should discard most uniform points without changing the hull
+        points = [(random.randrange(0, 10000, 1), random.randrange(0, 10000, 1)) for i in range(2000)]
+        stats = {}
+        hull = convexhull.computeHull(points, cyclic = True, prefilter = True, stats = stats)
+        self.assertEqual(hull, convexhull.computeHull(points, cyclic = True))
+        self.assertGreater(stats['prefilter_discarded'], len(points) // 2)
+        indices = array_convexhull.computeHull(np.array(points), prefilter = True)
+        self.assertEqual([points[i] for i in indices], hull)
+
+
+    def test_orientation_near_degenerate(self):
+        # Points within a few ulps of the line y = x: the filtered float predicate must agree with exact rational arithmetic
+        for i in range(1000):
+            a = (0.5 + random.randrange(0, 16) * 2.0 ** -53, 0.5 + random.randrange(0, 16) * 2.0 ** -53)
+            b, c = (12.0, 12.0), (24.0, 24.0)
+            self.assertEqual(predicates.orient2d(a, b, c), predicates.exactOrientation(a, b, c))
+            self.assertEqual(convexhull.findOrientation(a, b, c), -predicates.exactOrientation(a, b, c))
+            self.assertEqual(best_convexhull_code_yet.findOrientation(a, b, c), -predicates.exactOrientation(a, b, c))
+            # The cw/ccw/collinear helpers of both divide-and-conquer scripts give the same exact answer
+            for module in [benchmark_convexhull.convexhull, best_convexhull_code_yet]:
+                self.assertEqual((module.ccw(a, b, c), module.cw(a, b, c), module.collinear(a, b, c)),
+                                 tuple(predicates.exactOrientation(a, b, c) == sign for sign in [1, -1, 0]))
+        self.assertEqual(predicates.orient2d((0.5, 0.5), (12.0, 12.0), (24.0, 24.0)), 0)
+        self.assertEqual(predicates.orient2d((10 ** 20, 1), (10 ** 20 + 1, 2), (10 ** 20 + 2, 3)), 0)
+
+    def test_numpy_integer_points(self):
+        # numpy integer tuples (rows of an int array) with collinear runs hull like the same points as Python ints
+        points = [tuple(row) for row in np.random.randint(0, 20, (200, 2))] + [(np.int64(k), np.int64(3)) for k in range(20)]
+        plain = [(int(x), int(y)) for x, y in points]
+        self.assertEqual(convexhull.computeHull(points), convexhull.computeHull(plain))
+        self.assertEqual(convexhull.computeHull(points, cyclic = True), convexhull.computeHull(plain, cyclic = True))
+        self.assertEqual(convexhull.computeHull(points, cyclic = True, collinear = True), convexhull.computeHull(plain, cyclic = True, collinear = True))
+        # Products beyond int64 are redone in Python ints rather than trusted after wrapping around
+        big = np.int64(2 ** 40)
+        with np.errstate(over='ignore'):
+            self.assertEqual(predicates.orient2d((np.int64(0), np.int64(0)), (big, big + 1), (2 * big, 2 * big + 3)), 1)
+            self.assertEqual(predicates.crossSign((np.int64(0), np.int64(0)), (big, big), (big, np.int64(0)), (2 * big, big)), 0)
+
+
+    def test_parallel_hull_matches_serial(self):
+        # Lower the pool threshold so a small input still goes through the worker processes and the reduction tree
+        points = [(random.randrange(0, 1000, 1), random.randrange(0, 1000, 1)) for i in range(5000)]
+        threshold = parallel_convexhull.MIN_POINTS_PER_PROCESS
+        parallel_convexhull.MIN_POINTS_PER_PROCESS = 100
+        try:
+            hull = parallel_convexhull.parallelHull(points, k = 5, processes = 2)
+        finally:
+            parallel_convexhull.MIN_POINTS_PER_PROCESS = threshold
+        self.assertEqual(hull, convexhull.computeHull(points, cyclic = True))
+
+        # Every slab must hold at least MIN_POINTS_PER_PROCESS points: record the slabs with an in-process stand-in for the pool
+        slabs = []
+        class RecordingPool:
+            def __init__(self, processes, initializer, initargs): initializer(*initargs)
+            def __enter__(self): return self
+            def __exit__(self, *exc): pass
+            def map(self, task, bounds):
+                slabs.append(bounds)
+                return [task(bound) for bound in bounds]
+        points = list({(random.randrange(0, 10 ** 6), random.randrange(0, 10 ** 6)) for i in range(1000)})
+        pool = parallel_convexhull.Pool
+        parallel_convexhull.Pool = RecordingPool
+        try:
+            for minimum, expected in [(300, 3), (400, 2), (501, None), (2000, None)]:
+                parallel_convexhull.MIN_POINTS_PER_PROCESS = minimum
+                del slabs[:]
+                hull = parallel_convexhull.parallelHull(points, k = 8, processes = 8)
+                self.assertEqual(hull, convexhull.computeHull(points, cyclic = True))
+                self.assertEqual(len(slabs[0]) if slabs else None, expected)
+                for lo, hi in (slabs[0] if slabs else []): self.assertGreaterEqual(hi - lo, minimum)
+            parallel_convexhull.sharedMemory.close()
+        finally:
+            parallel_convexhull.Pool = pool
+            parallel_convexhull.MIN_POINTS_PER_PROCESS = threshold
+
+
+    def test_incremental_hull_tracks_computeHull(self):
+        # After every insertion the online hull should equal a full recompute; interior points are rejected
+        points = [(random.randrange(0, 50, 1), random.randrange(0, 50, 1)) for i in range(300)]
+        online = IncrementalHull()
+        for i in range(len(points)):
+            online.add(points[i])
+            self.assertEqual(online.hull(), convexhull.computeHull(points[:i + 1], cyclic = True))
+        self.assertFalse(online.add((25, 25)))
+        self.assertTrue(online.contains((25, 25)))
+        self.assertEqual(online.extend([(-1, -1), (25, 25)]), 1)
+
+        # With tiny chain blocks every update splits or joins blocks: points on growing circles keep replacing most of the hull
+        load = incremental_convexhull.CHAIN_LOAD
+        incremental_convexhull.CHAIN_LOAD = 2
+        try:
+            points = []
+            for radius in [10, 1000, 10 ** 5, 10 ** 7]:
+                points += [(int(radius * math.cos(t)), int(radius * math.sin(t))) for t in [random.uniform(0, 2 * math.pi) for i in range(60)]]
+            online = IncrementalHull()
+            for i in range(len(points)):
+                online.add(points[i])
+                expected = convexhull.computeHull(points[:i + 1], cyclic = True)
+                self.assertEqual(online.hull(), expected)
+                for chain in [online.lower, online.upper]:
+                    self.assertEqual(chain.maxes, [block[-1] for block in chain.blocks])
+                    self.assertTrue(all(0 < len(block) <= 4 for block in chain.blocks))
+                    self.assertEqual(list(chain), sorted(chain))
+            self.assertTrue(all(online.contains(point) for point in points))
+            self.assertFalse(online.contains((10 ** 7, 10 ** 7)))
+        finally:
+            incremental_convexhull.CHAIN_LOAD = load
+
+
+    def test_dynamic_hull_sliding_window(self):
+        # Slide a window over random points (with repeats): after every insert and delete the hull should match a full recompute
+        points = [(random.randrange(0, 40, 1), random.randrange(0, 40, 1)) for i in range(600)]
+        dynamic = dynamic_convexhull.DynamicHull(points[:200])
+        for i in range(200, len(points)):
+            dynamic.insert(points[i])
+            dynamic.delete(points[i - 200])
+            self.assertEqual(dynamic.hull(), convexhull.computeHull(points[i - 199:i + 1], cyclic = True))
+        self.assertEqual(len(dynamic), 200)
+        self.assertRaises(ValueError, dynamic.delete, (-1, -1))
+        # A window moving along x (as position tracks do) keeps splitting its last bucket and emptying its first one
+        track = [(t + random.random(), random.random()) for t in range(800)]
+        dynamic = dynamic_convexhull.DynamicHull(track[:100], bucket_size = 4)
+        for i in range(100, len(track)):
+            dynamic.insert(track[i])
+            dynamic.delete(track[i - 100])
+            self.assertEqual(dynamic.hull(), convexhull.computeHull(track[i - 99:i + 1], cyclic = True))
+        for point in track[-100:]: dynamic.delete(point)
+        self.assertEqual(dynamic.hull(), [])
+        dynamic.insert((1, 2))
+        self.assertEqual(dynamic.hull(), [(1, 2)])
+
+
+    def test_file_hull_matches_in_memory(self):
+        # Raw float64 pairs and .npy files read in small chunks should give the same hull as the in-memory engine
+        points = np.random.randn(20000, 2)
+        expected = [tuple(points[i]) for i in array_convexhull.computeHull(points)]
+        with tempfile.TemporaryDirectory() as directory:
+            raw, npy = os.path.join(directory, 'points.bin'), os.path.join(directory, 'points.npy')
+            points.tofile(raw)
+            np.save(npy, points)
+            self.assertEqual(file_convexhull.fileHull(raw, chunk_points = 3000), expected)
+            self.assertEqual(file_convexhull.fileHull(npy, chunk_points = 7000), expected)
+
+
+    def test_chan_engine_matches_divide_and_conquer(self):
+        # Start Chan's rounds at groups of 4 so that small inputs still go through several groups and failed rounds
+        first_round = hull_engines.FIRST_ROUND
+        hull_engines.FIRST_ROUND = 1
+        try:
+            for n in [0, 1, 2, 3, 10, 100, 2000]:
+                for grid in [4, 30, 10000]:
+                    points = [(random.randrange(0, grid, 1), random.randrange(0, grid, 1)) for i in range(n)]
+                    self.assertEqual(hull_engines.hull(points, algorithm = 'chan'), hull_engines.hull(points))
+        finally:
+            hull_engines.FIRST_ROUND = first_round
+        self.assertRaises(ValueError, hull_engines.hull, [(0, 0)], algorithm = 'no_such_engine')
+
+
+    def test_monotone_chain_engine(self):
+        # Integer grids take the inline exact path, floats go through the predicate: both should match divide and conquer
+        for n in [0, 1, 2, 3, 10, 1000]:
+            points = [(random.randrange(0, 20, 1), random.randrange(0, 20, 1)) for i in range(n)]
+            self.assertEqual(hull_engines.hull(points, algorithm = 'monotone_chain'), hull_engines.hull(points))
+            points = [(random.random(), random.random()) for i in range(n)]
+            self.assertEqual(hull_engines.hull(points, algorithm = 'monotone_chain'), hull_engines.hull(points))
+        self.assertEqual(hull_engines.hull([(10 ** 18, 0), (10 ** 18 + 1, 1), (10 ** 18 + 2, 2)], algorithm = 'monotone_chain'), [(10 ** 18, 0), (10 ** 18 + 2, 2)])
+
+
+    def test_batch_hulls_match_per_group_hulls(self):
+        # Group 3 is left empty; small integer grids give each group duplicates and collinear runs
+        for points in [np.random.rand(2000, 2), np.random.randint(0, 5, (2000, 2))]:
+            groups = np.random.choice([0, 1, 2, 4, 5, 6], len(points))
+            groups[:5] = 6
+            offsets, indices = array_convexhull.batchHulls(points, groups)
+            self.assertEqual(len(offsets), 8)
+            for g in range(7):
+                members = np.flatnonzero(groups == g)
+                expected = members[array_convexhull.computeHull(points[members])] if len(members) else []
+                self.assertEqual(indices[offsets[g]:offsets[g + 1]].tolist(), list(expected))
+        offsets, indices = array_convexhull.batchHulls(np.zeros((0, 2)), np.zeros(0, dtype=int))
+        self.assertEqual((offsets.tolist(), indices.tolist()), ([0], []))
+        with self.assertRaises(ValueError): array_convexhull.batchHulls(np.zeros((3, 2)), [0, -1, 0])
+
+
+    def test_hull_cache_hits_and_eviction(self):
+        cachedHull = HullCache(hull_engines.hull, max_entries = 2)
+        points = [(random.random(), random.random()) for i in range(500)]
+        hull = cachedHull(points)
+        self.assertEqual(hull, hull_engines.hull(points))
+        hull.append(hull[0])
+        self.assertEqual(cachedHull(list(points)), hull[:-1])
+        self.assertEqual((cachedHull.hits, cachedHull.misses), (1, 1))
+        # Interior points appended to a cached input are recognized without recomputing
+        self.assertEqual(cachedHull(points + [(0.5, 0.5), hull[0]]), hull[:-1])
+        self.assertEqual((cachedHull.hits, cachedHull.appended_hits, cachedHull.misses), (2, 1, 1))
+        outside = points + [(2.0, 2.0)]
+        self.assertEqual(cachedHull(outside), hull_engines.hull(outside))
+        self.assertEqual(cachedHull.misses, 2)
+        # Options are part of the key, and the least recently used entry is evicted
+        self.assertEqual(cachedHull(points, algorithm = 'chan'), hull[:-1])
+        self.assertEqual((len(cachedHull), cachedHull.misses), (2, 3))
+        cachedHull(points)
+        self.assertEqual(cachedHull.misses, 4)
+
+        array = np.random.rand(300, 2)
+        cachedArrayHull = HullCache(array_convexhull.computeHull, indices = True)
+        indices = cachedArrayHull(array)
+        self.assertEqual(cachedArrayHull(np.vstack((array, [[0.5, 0.5]]))).tolist(), indices.tolist())
+        self.assertEqual(cachedArrayHull.appended_hits, 1)
+        # Collinear mode lists boundary points, so one appended on an edge is not a hit
+        cachedCollinearHull = HullCache(convexhull.computeHull)
+        square = [(0, 0), (4, 0), (4, 4), (0, 4), (1, 1)]
+        self.assertEqual(cachedCollinearHull(square, collinear = True), [(0, 0), (4, 0), (4, 4), (0, 4)])
+        self.assertEqual(cachedCollinearHull(square + [(2, 0)], collinear = True), [(0, 0), (2, 0), (4, 0), (4, 4), (0, 4)])
+        self.assertEqual(cachedCollinearHull.appended_hits, 0)
+
+
+    def test_hull_index_containment(self):
+        # Small integer grids put many queries on hull edges and vertices, which count as inside
+        for n in [0, 1, 2, 3, 50]:
+            points = [(random.randrange(0, 8, 1), random.randrange(0, 8, 1)) for i in range(n)]
+            hull = convexhull.computeHull(points, cyclic = True)
+            queries = [(x, y) for x in range(-1, 10) for y in range(-1, 10)]
+            if len(hull) >= 3:
+                expected = [dynamic_convexhull.insideHull(hull, q) for q in queries]
+            else:
+                expected = [q in hull or (len(hull) == 2 and predicates.orient2d(hull[0], hull[1], q) == 0 and hull[0] <= q <= hull[1]) for q in queries]
+            index = HullIndex(hull[::-1])
+            self.assertEqual([q in index for q in queries], expected)
+            self.assertEqual(index.contains(np.array(queries)).tolist(), expected)
+        points = [(random.random(), random.random()) for i in range(500)]
+        index = HullIndex(hull_engines.hull(points))
+        self.assertTrue(index.contains(np.array(points)).all())
+        self.assertFalse(index.contains(np.array([[1.5, 0.5], [-0.5, 0.5], [0.5, 1.5]])).any())
+
+
+    def test_rotating_calipers(self):
+        square = [(0, 0), (2, 0), (2, 2), (0, 2)]
+        self.assertAlmostEqual(rotating_calipers.diameter(square)[0], 8 ** 0.5)
+        self.assertEqual(rotating_calipers.width(square[::-1])[0], 2)
+        # A rotated rectangle's minimum box is itself, although its axis-aligned box is twice as large
+        area, corners = rotating_calipers.minimumBoundingBox([(0, 1), (1, 0), (3, 2), (2, 3)])
+        self.assertAlmostEqual(area, 4)
+        self.assertEqual(sorted((round(x, 9), round(y, 9)) for x, y in corners), [(0, 1), (1, 0), (2, 3), (3, 2)])
+        self.assertEqual(rotating_calipers.diameter([(1, 1)]), (0, ((1, 1), (1, 1))))
+
+        # The batched variant agrees with the single-hull functions, and empty groups get NaN
+        points = np.random.rand(3000, 2)
+        groups = np.random.choice([0, 1, 3, 4], len(points))
+        groups[:2] = 4
+        offsets, indices = array_convexhull.batchHulls(points, groups)
+        diameters, widths, box_areas, boxes = rotating_calipers.batchCalipers(points, offsets, indices)
+        self.assertTrue(np.isnan(diameters[2]))
+        for g in [0, 1, 3, 4]:
+            hull = [tuple(p) for p in points[indices[offsets[g]:offsets[g + 1]]].tolist()]
+            self.assertAlmostEqual(diameters[g], rotating_calipers.diameter(hull)[0])
+            self.assertAlmostEqual(widths[g], rotating_calipers.width(hull)[0])
+            self.assertAlmostEqual(box_areas[g], rotating_calipers.minimumBoundingBox(hull)[0])
+
+
+    def test_point_tangents_and_binary_search_merge(self):
+        # Adding an outside point keeps the hull from one tangent vertex round to the other, then the point
+        for trial in range(200):
+            points = [(random.randrange(0, 7, 1), random.randrange(0, 7, 1)) for i in range(random.randrange(1, 20, 1))]
+            hull = convexhull.computeHull(points, cyclic = True)
+            index = HullIndex(hull)
+            for query in [(random.randrange(-2, 9, 1), random.randrange(-2, 9, 1)) for i in range(10)]:
+                expected = convexhull.computeHull(hull + [query], cyclic = True)
+                tangents = hull_tangents.pointTangents(hull, query)
+                if expected == hull:
+                    self.assertIsNone(tangents)
+                    self.assertIsNone(index.tangents(query))
+                    continue
+                i, j = tangents
+                cycle = [hull[(j + k) % len(hull)] for k in range((i - j) % len(hull) + 1)] + [query]
+                start = cycle.index(min(cycle))
+                self.assertEqual(cycle[start:] + cycle[:start], expected)
+                self.assertEqual(index.tangents(query), (hull[i], hull[j]))
+
+        # merge agrees with the linear-walk merge on x-separated hulls, in either argument order
+        for trial in range(200):
+            points = sorted(set((random.randrange(0, 4, 1), random.randrange(0, 12, 1)) for i in range(random.randrange(2, 30, 1))))
+            if len(points) < 2: continue
+            split = random.randrange(1, len(points), 1)
+            left = convexhull.computeHull(points[:split], cyclic = True)
+            right = convexhull.computeHull(points[split:], cyclic = True)
+            expected = convexhull.mergeHulls(left, right, cyclic = True)
+            self.assertEqual(hull_tangents.merge(left, right), expected)
+            self.assertEqual(hull_tangents.merge(right, left), expected)
+        with self.assertRaises(ValueError): hull_tangents.merge([(0, 0), (2, 0), (1, 1)], [(1, 0), (3, 1)])
+
+
+    def test_tracing_replaces_printing(self):
+        points = [(random.random(), random.random()) for i in range(200)]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            untraced = best_convexhull_code_yet.computeHull(points)
+            trace = HullTrace()
+            traced = best_convexhull_code_yet.computeHull(points, trace = trace)
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(traced, untraced)
+        # A call either is a base case or splits into two calls one level down and merges their hulls
+        levels = trace.levels()
+        self.assertEqual(levels[0]['calls'], 1)
+        self.assertEqual(levels[0]['points'], 200)
+        self.assertEqual(trace.maxDepth(), max(levels))
+        for depth in range(1, trace.maxDepth() + 1):
+            self.assertEqual(levels[depth]['calls'], 2 * levels[depth - 1]['merges'])
+        self.assertEqual(len(trace.walks), 2 * len(trace.merges))
+        self.assertEqual(levels[0]['merged_points'], len(traced))
+
+        # Both traced engines count a walk's steps as pointer advances: on this input each tangent takes three in either engine
+        points = [(0, 13), (4, 9), (5, 4), (16, 0), (19, 5), (19, 17)]
+        walks = []
+        for engine in [benchmark_convexhull.convexhull, best_convexhull_code_yet]:
+            trace = HullTrace()
+            engine.computeHull(list(points), trace = trace)
+            walks.append(sorted(trace.walks))
+        self.assertEqual(walks[0], walks[1])
+        self.assertEqual(walks[0], [(0, 'lower', 3), (0, 'upper', 3)])
+
+
+    def test_bottom_up_matches_recursion(self):
+        for n in [0, 1, 2, 3, 4, 7, 100, 1000]:
+            for points in [[(random.random(), random.random()) for i in range(n)], [(random.randrange(0, 6, 1), random.randrange(0, 6, 1)) for i in range(n)]]:
+                expected = convexhull.computeHull(points, cyclic = True)
+                for block_size in [1, 2, 3, 5, convexhull.BOTTOM_UP_BLOCK]:
+                    self.assertEqual(convexhull.computeHullBottomUp(points, block_size), expected)
+        self.assertEqual(hull_engines.hull([(0, 0), (2, 0), (1, 1), (1, 0)], algorithm = 'bottom_up'), [(0, 0), (2, 0), (1, 1)])
+        with self.assertRaises(ValueError): convexhull.computeHullBottomUp([(0, 0)], 0)
+
+
+    def test_duplicates_and_collinear_boundary_points(self):
+        # A 4x4 grid with every point repeated: strict mode keeps the corners, collinear mode the whole boundary in counterclockwise order
+        grid = [(x, y) for x in range(4) for y in range(4)] * 2
+        random.shuffle(grid)
+        self.assertEqual(convexhull.computeHull(grid, cyclic = True), [(0, 0), (3, 0), (3, 3), (0, 3)])
+        self.assertEqual(convexhull.computeHull(grid, collinear = True), [(0, 0), (1, 0), (2, 0), (3, 0), (3, 1), (3, 2), (3, 3), (2, 3), (1, 3), (0, 3), (0, 2), (0, 1)])
+        self.assertEqual(convexhull.computeHull([(2, 2), (0, 0), (1, 1), (1, 1)], collinear = True), [(0, 0), (1, 1), (2, 2)])
+        for i in range(50):
+            points = [(random.randrange(0, 5, 1), random.randrange(0, 5, 1)) for i in range(random.randint(4, 40))]
+            hull = convexhull.computeHull(points, cyclic = True)
+            boundary = convexhull.computeHull(points, collinear = True)
+            self.assertEqual([point for point in boundary if point in hull], hull)
+            self.assertTrue(all(predicates.orient2d(boundary[k - 2], boundary[k - 1], boundary[k]) >= 0 for k in range(len(boundary))))
+            # The legacy walks are not exact on degenerate input, but they finish within their step budget
+            self.assertIsInstance(convexhull.computeHull(points), list)
+        # Walking tangents to a clockwise right hull runs out of steps instead of looping forever
+        with self.assertRaises(ValueError): convexhull.walkTangents([(0, 3), (3, 3), (2, 6), (0, 4)], 0, 4, [(2, 6), (5, 5), (6, 1), (4, 0), (2, 4)], 0, 5)
+
+
+    def test_quickhull_matches_monotone_chain(self):
+        for n in [0, 1, 2, 3, 10, 1000]:
+            for points in [[(random.random(), random.random()) for i in range(n)], [(random.randrange(0, 6, 1), random.randrange(0, 6, 1)) for i in range(n)],
+                           [(0.1 * i, 0.3 * i + 0.7) for i in range(n)]]:
+                self.assertEqual(hull_engines.hull(points, algorithm = 'quickhull'), hull_engines.hull(points, algorithm = 'monotone_chain'))
+        # Points on a circle are all hull vertices: every round splits every segment
+        angles = np.random.random(2000) * 2 * np.pi
+        circle = np.column_stack((np.cos(angles), np.sin(angles)))
+        self.assertEqual(quickhull.computeHull(circle).tolist(), array_convexhull.computeHull(circle).tolist())
+        with self.assertRaises(ValueError): quickhull.computeHull(np.zeros((3, 3)))
+
+
+    def test_hull3d_mesh(self):
+        # A 4x4x4 grid: only the 8 corners are vertices and each square side is 2 triangles
+        grid = np.array([(i, j, k) for i in range(4) for j in range(4) for k in range(4)])
+        vertices, faces = hull3d.computeHull3d(grid)
+        self.assertEqual(sorted(map(tuple, grid[vertices].tolist())), [(i, j, k) for i in (0, 3) for j in (0, 3) for k in (0, 3)])
+        self.assertEqual(len(faces), 12)
+        for points in [np.random.random((2000, 3)), np.random.randint(0, 4, (300, 3))]:
+            vertices, faces = hull3d.computeHull3d(points)
+            x, y, z = points.T
+            corners = vertices[faces]
+            # Every point is inside or on every face, and each edge is shared with exactly one face going the other way
+            for a, b, c in corners.tolist():
+                self.assertTrue((hull3d.orientationSigns3d(x, y, z, a, b, c, np.arange(len(points)))[1] <= 0).all())
+            edges = [(u, v) for a, b, c in corners.tolist() for u, v in ((a, b), (b, c), (c, a))]
+            self.assertEqual(sorted(edges), sorted((v, u) for u, v in edges))
+            self.assertEqual(len(vertices) - len(edges) // 2 + len(faces), 2)
+        with self.assertRaises(ValueError): hull3d.computeHull3d(np.random.random((10, 2)))
+        with self.assertRaises(ValueError): hull3d.computeHull3d([(0, 0, 0), (1, 0, 0), (0, 1, 0), (1, 1, 0), (2, 3, 0)])
+
+
+    def test_approximate_hull_error_bound(self):
+        for strips in [1, 4, 64]:
+            for points in [np.random.random((3000, 2)), np.random.randint(0, 5, (200, 2))]:
+                indices, error_bound = array_convexhull.approximateHull(points, strips)
+                hull = [tuple(point) for point in points[indices].tolist()]
+                exact = hull_engines.hull([tuple(point) for point in points.tolist()], algorithm = 'monotone_chain')
+                # The approximation is inside the exact hull, in canonical order, and no point is more than error_bound outside it
+                self.assertTrue(isCyclicHull(hull, exact))
+                self.assertTrue(isCyclicHull([tuple(point) for point in points[np.unique(indices)].tolist()], hull))
+                outside = 0.0
+                for x, y in points.tolist():
+                    for k in range(len(hull)):
+                        (ax, ay), (bx, by) = hull[k], hull[(k + 1) % len(hull)]
+                        cross = (bx - ax) * (y - ay) - (by - ay) * (x - ax)
+                        if cross < 0: outside = max(outside, -cross / math.hypot(bx - ax, by - ay))
+                self.assertLessEqual(outside, error_bound + 1e-12)
+        # Enough strips on an integer grid catch every hull vertex
+        points = np.random.randint(0, 20, (500, 2))
+        self.assertEqual(points[array_convexhull.approximateHull(points, 1000)[0]].tolist(), points[array_convexhull.computeHull(points)].tolist())
+        with self.assertRaises(ValueError): array_convexhull.approximateHull(points, 0)
+
+
+    def test_convex_layers_match_repeated_hulls(self):
+        for points in [[(random.random(), random.random()) for i in range(300)], [(random.randrange(0, 8, 1), random.randrange(0, 8, 1)) for i in range(300)], []]:
+            # Peel with repeated hulls, removing each hull's vertices
+            expected, remaining, layer = {}, set(points), 0
+            while remaining:
+                hull = convexhull.computeHull(list(remaining), cyclic = True)
+                for point in hull: expected[point] = layer
+                remaining -= set(hull)
+                layer += 1
+            for block_size in [1, 3, 16]:
+                self.assertEqual(convexLayers(points, block_size), [expected[point] for point in points])
+        # Nested squares peel one square per layer, and the centre is the last layer
+        squares = [(x * k, y * k) for k in range(1, 6) for x, y in [(-1, -1), (1, -1), (1, 1), (-1, 1)]] + [(0, 0)]
+        self.assertEqual(convexLayers(squares), [4 - k // 4 for k in range(20)] + [5])
+
+
+    def test_convex_polygon_intersection_and_union(self):
+        area = lambda hull: sum(hull[i - 1][0] * hull[i][1] - hull[i][0] * hull[i - 1][1] for i in range(len(hull))) / 2
+        cross = lambda a, b, c: (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+        for trial in range(300):
+            first = convexhull.computeHull([(random.randint(0, 12), random.randint(0, 12)) for i in range(random.choice([1, 2, 3, 10]))], cyclic = True)
+            second = convexhull.computeHull([(random.randint(4, 16), random.randint(4, 16)) for i in range(random.choice([1, 2, 3, 10]))], cyclic = True)
+            self.assertEqual(convex_polygons.unionHull(first, second), convexhull.computeHull(first + second, cyclic = True))
+            common = convex_polygons.intersectHulls(first, second)
+            # Every vertex of the intersection is in both hulls, up to the rounding of computed crossings
+            for hull in (first, second):
+                if len(hull) < 3: continue
+                for point in common:
+                    self.assertTrue(all(cross(hull[i - 1], hull[i], point) > -1e-9 for i in range(len(hull))))
+            if len(first) >= 3 and len(second) >= 3 and len(common) >= 3:
+                self.assertTrue(isCyclicHull(common, common))
+                self.assertLessEqual(area(common), min(area(first), area(second)) + 1e-9)
+        # Nested, crossing, touching and disjoint squares
+        square = lambda x, y, side: [(x, y), (x + side, y), (x + side, y + side), (x, y + side)]
+        self.assertEqual(convex_polygons.intersectHulls(square(0, 0, 4), square(1, 1, 2)), square(1, 1, 2))
+        self.assertEqual(convex_polygons.intersectHulls(square(0, 0, 4), square(2, 2, 4)), square(2, 2, 2))
+        self.assertEqual(convex_polygons.intersectHulls(square(0, 0, 4), square(4, 1, 4)), [(4, 1), (4, 4)])
+        self.assertEqual(convex_polygons.intersectHulls(square(0, 0, 4), square(4, 4, 4)), [(4, 4)])
+        self.assertEqual(convex_polygons.intersectHulls(square(0, 0, 4), square(5, 0, 4)), [])
+        self.assertEqual(convex_polygons.intersectHulls(square(0, 0, 4), [(0, 0), (4, 4)]), [(0, 0), (4, 4)])
+        self.assertEqual(convex_polygons.intersectHulls(square(0, 0, 4), [(-2, 2), (2, 2)]), [(0, 2), (2, 2)])
+        squares = [square(x, y, 1) for x in range(5) for y in range(3)]
+        self.assertEqual(convex_polygons.unionHulls(squares), [(0, 0), (5, 0), (5, 3), (0, 3)])
+
+
     def test_running_time(self):
-        # Create a list of list_size[i] random elements 
-        list_sizes = [10, 100, 200, 500, 1000, 1500, 2000]
-        rand_points = []
-        for size in list_sizes:
-            rand_points.append([(random.randrange(0, 100, 1), random.randrange(0, 100, 1)) for j in range(size)])
-        computeHull_times = []
-        mergeSort_times = []
-
-        # For each list size, record computeHull's running time as well as MergeSort's
-        for i in range(len(list_sizes)):
-            computeHull_start_time = time.time()
-            convexhull.computeHull(rand_points[i])
-            computeHull_end_time = time.time()
-            computeHull_times.append(computeHull_end_time - computeHull_start_time)
-
-            x_points = [point[0] for point in rand_points[i]]
-            mergesort_start_time = time.time()
-            mergesort(x_points)
-            mergesort_end_time = time.time()
-            mergeSort_times.append(mergesort_end_time - mergesort_start_time)
-
-        # Create table of running times for a sorted and unsorted list of each size
-        headers = ("________________________________", "______________Compute Hull_____________", "______________Merge Sort______________")
-        print(headers[0], "|", headers[1], "|", headers[2])
-        for i in range(len(list_sizes)):  print("List Size: ", list_sizes[i], " " * (len(headers[0]) - len("List Size: " + str(list_sizes[i])) - 2), "| ", computeHull_times[i], " " * (len(headers[1]) - len(str(computeHull_times[i])) - 2), "| ", mergeSort_times[i])
+        # Timings come from benchmark_convexhull (run it directly for the full suite); here we check a small run and the baseline comparison
+        report = benchmark_convexhull.runBenchmarks(engines = ['new_convexhull.computeHull[cyclic]', 'array_convexhull.computeHull'],
+                                                    distributions = ['uniform', 'collinear'], sizes = [1000], repeats = 3, timeout = 60)
+        for result in report['results']:
+            self.assertEqual(result['status'], 'ok')
+            self.assertEqual(len(result['times']), 3)
+            self.assertLessEqual(result['min'], result['median'])
+            self.assertGreater(result['peak_memory_bytes'], 0)
+        self.assertEqual(benchmark_convexhull.compareToBaseline(report, report), [])
+        faster = {'results': [dict(result, median = result['median'] / 10) for result in report['results']]}
+        self.assertEqual(len(benchmark_convexhull.compareToBaseline(report, faster)), len(report['results']))
 
 if __name__ == '__main__':
     unittest.main()